@@ -3,17 +3,21 @@ import sympy as sp
 from enum import Enum
 import warnings
 
-from kaa.parallelotope import Parallelotope
+from kaa.parallelotope import Parallelotope, compute_generators, generator_rep
 from kaa.templates import TempStrategy
 from kaa.linearsystem import LinearSystem
 from kaa.lputil import minLinProg, maxLinProg
 from kaa.settings import KaaSettings
 from kaa.timer import Timer
+from kaa.parallel import TransformPool
 
 OptProd = KaaSettings.OptProd
 
 warnings.filterwarnings('ignore')
 
+'Cached objects depending only on the polytope, which survive template changes.'
+POLYTOPE_KEYS = ('intersect', 'box')
+
 class Bundle:
 
     def __init__(self, model, T, L, offu, offl):
@@ -22,12 +26,20 @@ class Bundle:
         assert np.size(L,0) == np.size(offl,0), "Directions matrix L and lower offsets must have matching dimensions {} {}".format(np.size(L,0), np.size(offl,0))
         assert np.size(T,1) == np.size(L,1), "Template matrix T must have the same dimensions as Directions matrix L"
 
+        'Directions, offsets and templates are kept as contiguous arrays. Templates hold row indices into L.'
+        self._L = np.array(L, dtype=float)
+        self._T = np.array(T, dtype=int)
+        self._offu = self.__freeze(np.array(offu, dtype=float))
+        self._offl = self.__freeze(np.array(offl, dtype=float))
+
         'Label the initial directions and templates with Default moniker.'
-        self.labeled_L = [ (dir_row, "Default" + str(row_idx)) for row_idx, dir_row in enumerate(L) ]
-        self.labeled_T = np.asarray([(row, "DefaultTemp", 1) for row in self.__convert_to_labeled_T(T)])
+        self.dir_labels = [ "Default" + str(row_idx) for row_idx in range(len(L)) ]
+        self.temp_labels = [ "DefaultTemp" + str(temp_idx) for temp_idx in range(len(T)) ]
+        self.temp_strat_ids = np.ones(len(T), dtype=int)
 
-        self.offu = offu
-        self.offl = offl
+        'Label to row index lookups, updated incrementally as directions and templates change.'
+        self.dir_idx = { label: row_idx for row_idx, label in enumerate(self.dir_labels) }
+        self.temp_idx = { label: temp_idx for temp_idx, label in enumerate(self.temp_labels) }
 
         self.model = model
         self.vars = model.vars
@@ -39,43 +51,90 @@ class Bundle:
 
         self.strat_temp_id = {}
 
+        'Set when the label structures are shared with a snapshot and must be copied before mutation.'
+        self._shared_labels = False
+
+        'Version counter bumped whenever the offsets, directions or templates change.'
+        self.version = 0
+
+        'Derived objects of the current version, such as parallelotopes and the bounding box.'
+        self._cache = {}
+
     @property
     def T(self):
+        return self._T
 
-        curr_T = self.__get_row(self.labeled_T)
-        gen_T = np.empty((self.num_temp, self.dim))
-        #print(f"L: {self.labeled_L}")
+    @property
+    def L(self):
+        return self._L
 
-        for row_idx, row_labels in enumerate(curr_T):
-            for col_idx, row_label in enumerate(row_labels):
-                gen_T[row_idx][col_idx] = self.__get_dir_row_from_label(row_label)
+    """
+    Offsets are read-only arrays so that every change goes through the setters and bumps the version.
+    """
+    @property
+    def offu(self):
+        return self._offu
 
-        return gen_T
+    @offu.setter
+    def offu(self, offu):
+        self._offu = self.__freeze(np.asarray(offu, dtype=float))
+        self.__bump_version()
 
     @property
-    def L(self):
-        return np.asarray(self.__get_row(self.labeled_L))
+    def offl(self):
+        return self._offl
 
-    "Returns list of Parallelotope objects defining this bundle. WARNING: superfluous calls to getParallelotope for now"
+    @offl.setter
+    def offl(self, offl):
+        self._offl = self.__freeze(np.asarray(offl, dtype=float))
+        self.__bump_version()
+
+    "Returns list of Parallelotope objects defining this bundle."
     @property
     def ptopes(self):
         return [self.getParallelotope(i) for i in range(self.num_temp)]
-    
+
+    """
+    Returns a lightweight snapshot of the bundle. The model, the frozen direction, template and offset arrays
+    and the cache of derived objects are shared. The label structures are copied lazily by whichever bundle
+    mutates its directions or templates first.
+    @returns new Bundle object sharing unchanged data with this one.
+    """
+    def copy(self):
+        for shared_arr in (self._L, self._T, self.temp_strat_ids):
+            shared_arr.setflags(write=False)
+
+        new_bund = object.__new__(Bundle)
+        new_bund.__dict__.update(self.__dict__)
+
+        self._shared_labels = new_bund._shared_labels = True
+        return new_bund
+
+    'Derived objects are rebuilt after unpickling rather than shipped along.'
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        return state
+
+    """
+    Upper bound on the volume of the bundle. The polytope is contained in each of its parallelotopes,
+    so the smallest exact parallelotope volume bounds it without any sampling or LPs.
+    """
+    @property
+    def volume_bound(self):
+        _, gen_mats = self.getGenerators()
+        return np.abs(np.linalg.det(gen_mats)).min()
+
     """
     Returns linear constraints representing the polytope defined by bundle.
     @returns linear constraints and their offsets.
     """
     def getIntersect(self):
+        return self.__cached('intersect', self.__build_intersect)
 
-        L = self.L
-        A = np.empty([2*self.num_dir, self.dim])
-        b = np.empty(2*self.num_dir)
-
-        for ind in range(self.num_dir):
-            A[ind] = L[ind]
-            A[ind + self.num_dir] = np.negative(L[ind])
-            b[ind] = self.offu[ind]
-            b[ind + self.num_dir] = self.offl[ind]
+    def __build_intersect(self):
+        A = np.vstack((self._L, np.negative(self._L)))
+        b = np.concatenate((self.offu, self.offl))
 
         return LinearSystem(self.model, A, b)
 
@@ -88,11 +147,28 @@ class Bundle:
     def canonize(self):
         bund_sys = self.getIntersect()
         L = self.L
+        box_dirs = np.eye(self.dim)
+
+        'The axis directions ride along in the same support call to produce the bounding box.'
+        supp_vals, _ = bund_sys.support(np.vstack((L, np.negative(L), box_dirs, np.negative(box_dirs))))
+        self.offu = supp_vals[:self.num_dir]
+        self.offl = supp_vals[self.num_dir:2*self.num_dir]
 
-        for row_ind, row in enumerate(L):
+        box_vals = supp_vals[2*self.num_dir:]
+        self._cache['box'] = np.column_stack((-box_vals[self.dim:], box_vals[:self.dim]))
 
-            self.offu[row_ind] = bund_sys.max_opt(row).fun
-            self.offl[row_ind] = bund_sys.max_opt(np.negative(row)).fun
+    """
+    Returns the axis-aligned bounding box of the polytope defined by the bundle.
+    The box computed during canonization is reused until the bundle changes.
+    @returns (dim x 2) array of the [min, max] interval of each variable.
+    """
+    def getBoundingBox(self):
+        return self.__cached('box', self.__build_box)
+
+    def __build_box(self):
+        box_dirs = np.eye(self.dim)
+        supp_vals, _ = self.getIntersect().support(np.vstack((box_dirs, np.negative(box_dirs))))
+        return np.column_stack((-supp_vals[self.dim:], supp_vals[:self.dim]))
 
     """
     Returns list of Parallelotopes by the strategy they are associated with.
@@ -104,11 +180,7 @@ class Bundle:
             return [None]
 
         temp_id = self.strat_temp_id[str(strat)]
-
-        asso_temps = []
-        for temp_idx, (_,_, tid) in enumerate(self.labeled_T):
-            if tid == temp_id:
-                asso_temps.append(temp_idx)
+        asso_temps = np.flatnonzero(self.temp_strat_ids == temp_id)
 
         return [self.getParallelotope(temp_idx) for temp_idx in asso_temps]
 
@@ -119,43 +191,71 @@ class Bundle:
     @returns Parallelotope object described by T[temp_ind]
     """
     def getParallelotope(self, temp_ind):
+        return self.__cached(('ptope', temp_ind), lambda: self.__build_ptope(temp_ind))
 
-        L = self.L
-        T = self.T
-        A = np.empty([2*self.dim,self.dim])
-        b = np.empty(2*self.dim)
+    def __build_ptope(self, temp_ind):
 
         'Fetch linear constraints defining the parallelotope.'
-        for fac_ind, facet in enumerate(T[temp_ind].astype(int)):
-            A[fac_ind] = L[facet]
-            A[fac_ind + self.dim] = np.negative(L[facet])
-            b[fac_ind] = self.offu[facet]
-            b[fac_ind + self.dim] = self.offl[facet]
+        facets = self._T[temp_ind]
+        A = np.vstack((self._L[facets], np.negative(self._L[facets])))
+        b = np.concatenate((self.offu[facets], self.offl[facets]))
 
         return Parallelotope(self.model, A, b)
 
     """
-    Add a matrix of templates to the end of templates matrix.
-    @params temp_row_mat: Matrix of new template entries.
+    Computes the generator representation of every parallelotope of the bundle with one batched inversion.
+    @returns (num_temp x dim) array of base vertices, (num_temp x dim x dim) array of generator matrices
+    """
+    def getGenerators(self):
+        return self.__cached('generators', self.__build_generators)
+
+    def __build_generators(self):
+        facets = self._T
+
+        Timer.start('Generator Procedure')
+        base_vertices, gen_mats = compute_generators(self._L[facets], self.offu[facets], self.offl[facets])
+        Timer.stop('Generator Procedure')
+
+        return base_vertices, gen_mats
+
+    """
+    Add a template to the end of templates matrix.
+    @params asso_strat: strategy owning the template
+            row_labels: labels of the directions composing the template
+            temp_label: label of the new template
     """
     def add_temp(self, asso_strat, row_labels, temp_label):
 
         assert len(row_labels) == self.dim, "Number of directions to use in template must match the dimension of the system."
 
-        new_temp_ent = (self.__get_global_labels(asso_strat, row_labels), self.__get_global_labels(asso_strat, temp_label), self.__get_temp_id(asso_strat))
-        self.labeled_T = np.append(self.labeled_T, [new_temp_ent], axis=0)
-        self.num_temp = len(self.labeled_T)
+        self.__own_labels()
+
+        temp_row = [ self.dir_idx[label] for label in self.__get_global_labels(asso_strat, row_labels) ]
+        global_label = self.__get_global_labels(asso_strat, temp_label)
+
+        self._T = np.append(self._T, [temp_row], axis=0)
+        self.temp_strat_ids = np.append(self.temp_strat_ids, self.__get_temp_id(asso_strat))
+        self.temp_labels.append(global_label)
+        self.temp_idx[global_label] = len(self.temp_labels) - 1
+        self.num_temp = len(self._T)
+        self.__bump_version(keep=POLYTOPE_KEYS)
 
     """
     Remove specified template entries from templates matrix.
-    @params temp_idx: list of indices specifying row indices in template matrix
+    @params asso_strat: strategy owning the template
+            temp_label: label of template to remove
     """
     def remove_temp(self, asso_strat, temp_label):
 
-        label_indices = self.__get_label_indices(self.labeled_T, self.__get_global_labels(asso_strat, temp_label))
-        self.labeled_T = np.delete(self.labeled_T, label_indices, axis=0)
-        #print(f"labeled_T: {self.labeled_T}")
-        self.num_temp = len(self.labeled_T)
+        self.__own_labels()
+
+        global_labels = self.__get_global_labels(asso_strat, temp_label if isinstance(temp_label, list) else [temp_label])
+        temp_indices = self.__pop_label_indices(self.temp_labels, self.temp_idx, global_labels)
+
+        self._T = np.delete(self._T, temp_indices, axis=0)
+        self.temp_strat_ids = np.delete(self.temp_strat_ids, temp_indices)
+        self.num_temp = len(self._T)
+        self.__bump_version(keep=POLYTOPE_KEYS)
 
     """
     Add matrix of direction to end of directions matrix.
@@ -167,38 +267,89 @@ class Bundle:
 
         assert len(dir_row_mat) == len(dir_labels), "Number of input direction rows must be one-to-one with the labels"
 
+        self.__own_labels()
+
         bund_sys = self.getIntersect()
         prev_len = self.num_dir
 
         'Update new templates to envelope current polytope'
-        labeled_L_ents = zip(dir_row_mat, self.__get_global_labels(asso_strat, dir_labels))
-        self.labeled_L = np.append(self.labeled_L, list(labeled_L_ents), axis=0)
+        dir_row_mat = np.asarray(dir_row_mat, dtype=float)
+        supp_vals, _ = bund_sys.support(np.vstack((dir_row_mat, np.negative(dir_row_mat))))
+
+        self._L = np.append(self._L, dir_row_mat, axis=0)
+        self.offu = np.append(self.offu, supp_vals[:len(dir_row_mat)])
+        self.offl = np.append(self.offl, supp_vals[len(dir_row_mat):])
+
+        for row_idx, label in enumerate(self.__get_global_labels(asso_strat, dir_labels), start=prev_len):
+            self.dir_labels.append(label)
+            self.dir_idx[label] = row_idx
+
+        self.num_dir = len(self._L)
+        self.__bump_version()
 
-        new_uoffsets = [[ bund_sys.max_opt(row).fun for row in dir_row_mat ]]
-        new_loffsets = [[ bund_sys.max_opt(np.negative(row)).fun for row in dir_row_mat ]]
-        
-        self.offu = np.append(self.offu, new_uoffsets)
-        self.offl = np.append(self.offl, new_loffsets)
-        self.num_dir = len(self.labeled_L)
-        
     """
     Remove specified direction entries from directions matrix from their labels.
-    @params temp_idx: list of indices specifying row indices in directions matrix
+    The directions must no longer be referenced by any template.
+    @params asso_strat: strategy owning the directions
+            labels: labels of directions to remove
     """
     def remove_dirs(self, asso_strat, labels):
-    
-        label_indices = self.__get_label_indices(self.labeled_L, self.__get_global_labels(asso_strat, labels))
 
-        #print(f"RemoveDir: Labels: {global_labels}")
-        #print(f"labeled_L: {self.labeled_L}")
-        #print(f"Mask: {label_indices}")
-        
-        self.labeled_L = np.delete(self.labeled_L, label_indices, axis=0)
-        self.num_dir = len(self.labeled_L)
+        self.__own_labels()
+
+        dir_indices = self.__pop_label_indices(self.dir_labels, self.dir_idx, self.__get_global_labels(asso_strat, labels))
+        assert not np.isin(self._T, dir_indices).any(), "Cannot remove directions still used by a template."
+
+        self._L = np.delete(self._L, dir_indices, axis=0)
+        self.offu = np.delete(self.offu, dir_indices)
+        self.offl = np.delete(self.offl, dir_indices)
 
-        self.offu = np.delete(self.offu, label_indices, axis=0)
-        self.offl = np.delete(self.offl, label_indices, axis=0)
+        'Shift the template entries pointing past the removed rows.'
+        keep_mask = np.ones(self.num_dir, dtype=bool)
+        keep_mask[dir_indices] = False
+        new_idx = np.cumsum(keep_mask) - 1
+        self._T = new_idx[self._T]
 
+        self.num_dir = len(self._L)
+        self.__bump_version()
+
+    """
+    Starts a new version of the bundle. The cache is replaced rather than cleared since snapshots may still share it.
+    @params keep: cache keys still valid for the new version
+    """
+    def __bump_version(self, keep=()):
+        self.version += 1
+        self._cache = { key: self._cache[key] for key in keep if key in self._cache }
+
+    """
+    Returns the derived object stored under key for the current version, building it on the first request.
+    @params key: cache key
+            build: function computing the object
+    """
+    def __cached(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+
+        return self._cache[key]
+
+    @staticmethod
+    def __freeze(arr):
+        arr.setflags(write=False)
+        return arr
+
+    """
+    Copies the label structures if they are still shared with a snapshot.
+    """
+    def __own_labels(self):
+        if not self._shared_labels:
+            return
+
+        self.dir_labels = list(self.dir_labels)
+        self.temp_labels = list(self.temp_labels)
+        self.dir_idx = dict(self.dir_idx)
+        self.temp_idx = dict(self.temp_idx)
+        self.strat_temp_id = dict(self.strat_temp_id)
+        self._shared_labels = False
 
     def __get_temp_id(self, asso_strat):
 
@@ -219,74 +370,27 @@ class Bundle:
         return [ str(asso_strat) + label for label in labels ] if isinstance(labels, list) else str(asso_strat) + labels
 
     """
-    Returns the indices which a list of indices or an index points towrads in the tuple matrix.
-    @params tup mat: input tuple matrix
-            labels: list of labels or a single label relevant to search
-    @returns list of indices which a label in the input points towards
+    Removes labels from an ordered label list and its label to index lookup.
+    Only the lookup entries of rows after the first removed row are re-indexed.
+    Labels which are not present are ignored.
+    @params label_list: ordered list of labels i.e self.dir_labels or self.temp_labels
+            idx_dict: lookup from label to row index
+            labels: labels to remove
+    @returns sorted list of the removed row indices.
     """
-    def __get_label_indices(self, tup_mat, labels):
-        label_set = set(labels) if isinstance(labels, list) else set([labels])
-        #print(self.__get_label(tup_mat))
-        return [idx for idx, label in enumerate(self.__get_label(tup_mat)) if label in label_set]
+    def __pop_label_indices(self, label_list, idx_dict, labels):
+        indices = sorted(idx_dict.pop(label) for label in set(labels) if label in idx_dict)
+        if not indices:
+            return indices
 
-    """
-    Returns the row data in order of the labeled matrix rows. The input will be a
-    labeled matrix i.e list of tuples where the first coordinate contains the data
-    and the second value contains the label of the data.
-    @params tup_mat: input tuple matrix i.e self.labeled_L or self.labeled_T
-    @returns list of rows (data) in order which they appear in the input tuple matrix.
-    """
-    def __get_row(self, tup_mat):
-        return list(map(lambda row_label_tup: row_label_tup[0], tup_mat))
+        for idx in reversed(indices):
+            del label_list[idx]
 
-    """
-    Returns the labels in order of the labeled matrix rows. The input will be a
-    labeled matrix i.e list of tuples where the first coordinate contains the data
-    and the second value contains the label of the data.
-    @params tup_mat: input tuple matrix i.e self.labeled_L or self.labeled_T
-    @returns list of labels in order which they appear in the input tuple matrix.
-    """
-    def __get_label(self, tup_mat):
-        return list(map(lambda row_label_tup: row_label_tup[1], tup_mat))
+        for row_idx in range(indices[0], len(label_list)):
+            idx_dict[label_list[row_idx]] = row_idx
 
-    """
-    Searches for the row which the input label points to in the directions matrix.
-    @params dir_label: label to search for
-    @returns index which label points to.
-    """
-    def __get_dir_row_from_label(self, dir_label):
-        label_indices = self.__get_label_indices(self.labeled_L, dir_label)
-        assert len(label_indices) == 1, f"Every index should have a unique label. Offending list: {label_indices}"
-        return label_indices[0]
+        return indices
 
-    """
-    Converts template matrix from numpy form into a labeled form
-    containing only the list of labels pointing to the relevant rows in
-    the directions matrix
-    @params T: numpy template matrix with integer entries
-    @returns list of lists containing labels pointing to direction matrix rows.
-    """
-    def __convert_to_labeled_T(self, T):
-
-        labeled_T = []
-        for temp_row in T:
-            labeled_T.append([self.labeled_L[col][1] for col in temp_row.astype(int)])
-
-        return np.asarray(labeled_T)
-
-    """
-    Copies bundle information into a new Bundle object
-    @returns new Bundle object copy.
-
-    def copy(self):
-        new_T = np.copy(self.T)
-        new_L = np.copy(self.L)
-        new_offu = np.copy(self.offu)
-        new_offl = np.copy(self.offl)
-        
-        return Bundle(self.model, new_T, new_L, new_offu, new_offl)
-    """
-    
 """
 Wrapper over bundle transformation modes.
 """
@@ -306,10 +410,22 @@ class BundleTransformer:
     Otherwise, a value of BundleMode.AFO (0) indicates using the All-for-One transformation method.
     """
     def __init__(self, model, mode):
-        self.f = model.f
+        self.f_poly = model.f_poly
         self.vars = model.vars
         self.ofo_mode = mode
 
+        'Compose numerically if the dynamics were compiled and the optimization procedure accepts them.'
+        self.compiled = self.f_poly is not None and OptProd.accepts_compiled
+
+        'The sympy dynamics are only needed for symbolic composition.'
+        self.f = None if self.compiled else model.f
+
+        'Persistent worker pool. Only compiled dynamics can be shipped to the workers.'
+        self.pool = TransformPool(model, OptProd, KaaSettings.NumWorkers) if KaaSettings.use_parallel and self.compiled else None
+
+        'Refinement report of the optimization procedure for the last transformation.'
+        self.step_report = None
+
     """
     Transforms the bundle according to the dynamics governing the system. (dictated by self.f)
 
@@ -323,22 +439,23 @@ class BundleTransformer:
         new_offu = np.full(bund.num_dir, np.inf)
         new_offl = np.full(bund.num_dir, np.inf)
 
-        for row_ind, row in enumerate(T):
-            
-            'Find the generator of the parallelotope.'
-            ptope = bund.getParallelotope(row_ind)
-            #print(f"Ptope {row_ind}\n")
+        'Toggle iterators between OFO/AFO'
+        dir_idx_list = [ row.astype(int) if self.ofo_mode.value else np.arange(bund.num_dir) for row in T ]
+        gen_list = list(zip(*bund.getGenerators()))
 
-            'Toggle iterators between OFO/AFO'
-            direct_iter = row.astype(int) if self.ofo_mode.value else range(bund.num_dir)
-            #print(f"Num of directions: {bund.num_dir}")
+        'All directions share the composition and expansion work done for their parallelotope.'
+        if self.pool is not None:
+            Timer.start('Bound Computation')
+            bounds, self.step_report = self.pool.find_bounds(gen_list, [ L[dir_idxs] for dir_idxs in dir_idx_list ])
+            Timer.stop('Bound Computation')
+        else:
+            with OptProd.step_scope():
+                bounds = [ self.__find_bounds(L[dir_idxs], gens, bund) for gens, dir_idxs in zip(gen_list, dir_idx_list) ]
+                self.step_report = OptProd.step_report()
 
-            for column in direct_iter:
-                curr_L = L[column]
-                ub, lb = self.__find_bounds(curr_L, ptope, bund)
-
-                new_offu[column] = min(ub, new_offu[column])
-                new_offl[column] = min(lb, new_offl[column])
+        for dir_idxs, (ub, lb) in zip(dir_idx_list, bounds):
+            new_offu[dir_idxs] = np.minimum(ub, new_offu[dir_idxs])
+            new_offl[dir_idxs] = np.minimum(lb, new_offl[dir_idxs])
 
         bund.offu = new_offu
         bund.offl = new_offl
@@ -350,15 +467,57 @@ class BundleTransformer:
         return bund
 
     """
-    Find bounds for max c^Tf(x) over paralleltope
-    @params: ptope: Parallelotope object to optimize over.
-             dir_vec: direction vector
-    @returns: upper bound, lower bound
+    Shuts down the worker pool if one was started.
     """
-    def __find_bounds(self, dir_vec, ptope, bund):
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    """
+    Find bounds for max c^Tf(x) over paralleltope for every direction c in dir_mat.
+    The dynamics are composed once with the parallelotope's generator map and shared across all directions.
+    @params: dir_mat: matrix whose rows are the direction vectors
+             gens: base vertex and generator matrix of the parallelotope to optimize over.
+    @returns: arrays of upper bounds, lower bounds
+    """
+    def __find_bounds(self, dir_mat, gens, bund):
+
+        if self.compiled:
+            fog = self.__compose_compiled(*gens)
+        else:
+            fog = self.__compose_sympy(*gens)
+
+        'Calculate min/max Bernstein coefficients.'
+        Timer.start('Bound Computation')
+        ub, lb = OptProd.getDirBounds(fog, dir_mat, bund)
+        Timer.stop('Bound Computation')
+
+        return ub, -1 * lb
+
+    """
+    Compose the compiled dynamics with the affine generator map of the parallelotope.
+    No sympy objects are created along this path.
+    @params: base_vertex, gen_mat: generator representation of the parallelotope
+    @returns list of Polynomials f o g over the unit box.
+    """
+    def __compose_compiled(self, base_vertex, gen_mat):
+        Timer.start('Functional Composition')
+        fog = self.f_poly.compose_affine(base_vertex, gen_mat)
+        Timer.stop('Functional Composition')
+
+        return fog
+
+    """
+    Compose the sympy dynamics with the generator representation of the parallelotope.
+    Used for non-polynomial dynamics or optimization procedures requiring sympy input.
+    @params: base_vertex, gen_mat: generator representation of the parallelotope
+    @returns list of sympy expressions f o g over the unit box.
+    """
+    def __compose_sympy(self, base_vertex, gen_mat):
 
         'Find the generator of the parallelotope.'
-        genFun = ptope.getGeneratorRep()
+        genFun = generator_rep(base_vertex, gen_mat, self.vars)
 
         'Create subsitutions tuples.'
         var_sub = []
@@ -366,19 +525,10 @@ class BundleTransformer:
             var_sub.append((var, genFun[var_ind]))
 
         #print(f"Variable Sub for {dir_vec}: {var_sub}")
-        
+
+        'Perform functional composition with exact transformation from unitbox to parallelotope.'
         Timer.start('Functional Composition')
         fog = [ func.subs(var_sub, simultaneous=True) for func in self.f ]
         Timer.stop('Functional Composition')
 
-        'Perform functional composition with exact transformation from unitbox to parallelotope.'
-        bound_polyu = 0
-        for coeff_idx, coeff in enumerate(dir_vec):
-            bound_polyu += coeff * fog[coeff_idx]
-
-        'Calculate min/max Bernstein coefficients.'
-        Timer.start('Bound Computation')
-        ub, lb = OptProd(bound_polyu, bund).getBounds()
-        Timer.stop('Bound Computation')
-
-        return ub, -1 * lb
+        return fog
@@ -1,10 +1,13 @@
+import numpy as np
 from plotly.offline import iplot
 import plotly.graph_objects as go
 
 from kaa.reach import ReachSet
 from kaa.plotutil import Plot, TempAnimation
-from kaa.trajectory import Traj, TrajCollection
+from kaa.trajectory import TrajCollection
 from kaa.experiutil import get_init_box_borders
+from kaa.parallel import run_reach_jobs
+from kaa.settings import KaaSettings
 
 class Experiment:
 
@@ -19,21 +22,31 @@ class Experiment:
 
     """
     Execute the reachable set simulations and add the flowpipes to the Plot.
+    @params parallel: run the inputs in a process pool, defaults to KaaSettings.ParallelExperiments
+            vol_method: volume metric to precompute on each flowpipe, or None
     """
-    def execute(self):
-        self.output_flowpipes = []
+    def execute(self, parallel=None, vol_method=None):
+        parallel = KaaSettings.ParallelExperiments if parallel is None else parallel
+        self.add_flowpipes(run_reach_jobs(self.reach_jobs, parallel, vol_method=vol_method))
 
-        for experi_input in self.inputs:
-            model = experi_input['model']
-            strat = experi_input['strat']
-            label = experi_input['label']
-            num_steps = experi_input['num_steps']
+    """
+    List of (model, strategy, steps) jobs, one for each input.
+    """
+    @property
+    def reach_jobs(self):
+        return [ (experi_input['model'], experi_input['strat'], experi_input['num_steps']) for experi_input in self.inputs ]
+
+    """
+    Adds the flowpipes computed for the inputs to the Plot.
+    @params flowpipes: list of FlowPipe objects in the order of self.inputs
+    """
+    def add_flowpipes(self, flowpipes):
+        self.output_flowpipes = []
 
-            mod_reach = ReachSet(model)
-            mod_flow = mod_reach.computeReachSet(num_steps, tempstrat=strat)
-            self.plot.add(mod_flow, label=label)
+        for experi_input, mod_flow in zip(self.inputs, flowpipes):
+            self.plot.add(mod_flow, label=experi_input['label'])
             self.output_flowpipes.append(mod_flow)
-            self.max_num_steps = max(self.max_num_steps, num_steps)
+            self.max_num_steps = max(self.max_num_steps, experi_input['num_steps'])
 
     """
     Plot the results fed into the Plot object
@@ -45,9 +58,9 @@ class Experiment:
            
         self.plot.plot(*var_tup)
 
-    def get_total_vol_results(self):
+    def get_total_vol_results(self, vol_method=None):
         assert self.output_flowpipes is not None, "Execute Experiment with ExperimentInputs before retrieving volume data."
-        return [flowpipe.total_volume for flowpipe in self.output_flowpipes]
+        return [np.sum(flowpipe.get_volume_data(vol_method)) for flowpipe in self.output_flowpipes]
 
     """
     Extract the initial box intervals from the model
@@ -65,8 +78,7 @@ class Experiment:
         init_box_inter = self.__get_init_box()
         border_points = get_init_box_borders(init_box_inter)
 
-        trajs = [Traj(self.model, point, num_steps) for point in border_points]
-        return TrajCollection(trajs)
+        return TrajCollection.simulate(self.model, border_points, num_steps)
 
 class PhasePlotExperiment(Experiment):
 
@@ -107,27 +119,46 @@ class ExperimentBatch:
         assert isinstance(experiment, Experiment), "Only takes Experiment objects."
         self.experiments.append(experiment)
 
-    def execute(self):
+    """
+    Executes every experiment of the batch. The inputs of all experiments are run as one list of jobs,
+    sharing one process pool in parallel mode.
+    @params parallel: run the inputs in a process pool, defaults to KaaSettings.ParallelExperiments
+            vol_method: volume metric to precompute on each flowpipe, or None
+    """
+    def execute(self, parallel=None, vol_method=None):
         assert len(self.experiments) != 0, "Must add Experiments to ExperimentBatch before executing the batch."
+        parallel = KaaSettings.ParallelExperiments if parallel is None else parallel
+
+        print(f"\n Executing Experiments {', '.join(experi.label for experi in self.experiments)} \n")
+
+        jobs = [ job for experi in self.experiments for job in experi.reach_jobs ]
+        flowpipes = run_reach_jobs(jobs, parallel, vol_method=vol_method)
+
         for experi in self.experiments:
-            print(f"\n Executing Experiment {experi.label} \n")
-            experi.execute()
+            num_jobs = len(experi.inputs)
+            experi.add_flowpipes(flowpipes[:num_jobs])
+            flowpipes = flowpipes[num_jobs:]
 
-    def get_vol_data(self):
-        return [experi.get_total_vol_results() for experi in self.experiments]
+    def get_vol_data(self, vol_method=None):
+        return [experi.get_total_vol_results(vol_method) for experi in self.experiments]
 
     def get_strat_labels(self):
         return [str(experi.inputs[0]['strat']) for experi in self.experiments]
         
-def exec_plot_vol_results(*experi_bat):
+"""
+Executes the experiment batches and tabulates the total flowpipe volume of each strategy.
+@params experi_bat: ExperimentBatch objects
+        vol_method: volume metric passed to FlowPipe.get_volume_data. The exact and bound metrics are deterministic.
+"""
+def exec_plot_vol_results(*experi_bat, vol_method=None):
 
     experi_tables = []
     for experi_bat_idx, experi_bat in enumerate(experi_bat):
-        experi_bat.execute()
+        experi_bat.execute(vol_method=KaaSettings.VolumeMethod if vol_method is None else vol_method)
         
         tab_header = dict(values=['Strategy', 'Total Volume'],
                   align='left')
-        tab_cells = dict(values=[experi_bat.get_strat_labels(),experi_bat.get_vol_data()],
+        tab_cells = dict(values=[experi_bat.get_strat_labels(),experi_bat.get_vol_data(vol_method)],
                   align='left')
 
         experi_vol_table = go.Table(header=tab_header, cells=tab_cells)
@@ -1,18 +1,31 @@
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import shutil
+import tempfile
+import weakref
 
 from kaa.timer import Timer
-from kaa.settings import PlotSettings
+from kaa.settings import KaaSettings, PlotSettings
 from kaa.templates import MultiStrategy
+from kaa.bundle import Bundle
 
 """
 Object encapsulating flowpipe data. A flowpipe in this case will be a sequence of Bundle objects.
 """
 class FlowPipe:
 
-    def __init__(self, flowpipe, model, strat):
+    """
+    @params flowpipe: sequence of Bundle objects i.e a list or a DiskBundleStore
+            model: Model the flowpipe was computed from
+            strat: TempStrategy acting during the computation
+            boxes: optional (len x dim x 2) array of the [min, max] bounding box of each bundle
+    """
+    def __init__(self, flowpipe, model, strat, boxes=None):
 
         self.flowpipe = flowpipe
+        self._boxes = boxes
+        self._vol_data = {}
         self.model = model
         self.strat = strat
         self.vars = model.vars
@@ -32,6 +45,17 @@ class FlowPipe:
     def model_name(self):
         return self.model.name
 
+    """
+    Returns the (len x dim x 2) array holding the [min, max] bounding box of every bundle.
+    Computed once from the bundles if the reachable set computation did not supply it.
+    """
+    @property
+    def boxes(self):
+        if self._boxes is None:
+            self._boxes = np.asarray([ bund.getBoundingBox() for bund in self.flowpipe ])
+
+        return self._boxes
+
     """
     Returns accumlation sum of the bundle volumes
     """
@@ -51,42 +75,28 @@ class FlowPipe:
         return strat_flowpipe
 
     """
-    Returns array of volume data for each bundle in the flowpipe.
+    Returns array of volume data for each bundle in the flowpipe. Computed once per method and cached.
+    @params method: sample for the Monte-Carlo estimate, exact for vertex enumeration or bound for the
+                    smallest parallelotope volume. Defaults to KaaSettings.VolumeMethod
     @returns array of volume data.
     """
-    def get_volume_data(self):
-        vol_data = np.empty(self.length)
-        for idx, bund in enumerate(self.flowpipe):
-            vol_data[idx] = bund.getIntersect().volume
+    def get_volume_data(self, method=None):
+        method = KaaSettings.VolumeMethod if method is None else method
+
+        if method not in self._vol_data:
+            self._vol_data[method] = np.asarray([ volume_of(bund, method) for bund in self.flowpipe ])
+
+        return self._vol_data[method]
 
-        return vol_data
-    
     """
-    Calculates the flowpipe projection of reachable set against time t.
+    Calculates the flowpipe projection of reachable set against time t. The projection is read off the
+    per-step bounding boxes without solving any LPs.
     @params var: The variable for the reachable set to be projected onto.
     @returns list of minimum and maximum points of projected set at each time step.
     """
     def get2DProj(self, var_ind):
-        pipe_len = len(self.flowpipe)
-
         Timer.start('Proj')
-        curr_var = self.vars[var_ind]
-
-        'Vector of minimum and maximum points of the polytope represented by parallelotope bundle.'
-        y_min, y_max = np.empty(pipe_len), np.empty(pipe_len)
-
-        'Initialize objective function'
-        y_obj = [0 for _ in self.vars]
-        y_obj[var_ind] = 1
-
-        'Calculate the minimum and maximum points through LPs for every iteration of the bundle.'
-        for bund_ind, bund in enumerate(self.flowpipe):
-
-            bund_sys = bund.getIntersect()
-
-            y_min[bund_ind] = bund_sys.max_opt(y_obj).fun
-            y_max[bund_ind] = bund_sys.min_opt(y_obj).fun
-
+        y_min, y_max = self.boxes[:, var_ind, 1], self.boxes[:, var_ind, 0]
         Timer.stop("Proj")
 
         return y_min, y_max
@@ -97,5 +107,130 @@ class FlowPipe:
     def __iter__(self):
         return iter(self.flowpipe)
 
+    def __getitem__(self, index):
+        return self.flowpipe[index]
+
     def __str__(self):
         return "{} Len: {}".format(self.strat, len(self))
+
+"""
+Computes the volume of a bundle with the input method.
+@params bund: Bundle object
+        method: sample, exact or bound
+@returns volume of bundle
+"""
+def volume_of(bund, method):
+    if method == 'bound':
+        return bund.volume_bound
+
+    bund_sys = bund.getIntersect()
+    if method == 'exact':
+        return bund_sys.exact_volume
+
+    assert method == 'sample', f"Unknown volume method: {method}"
+    return bund_sys.volume
+
+"""
+Sequence of bundles spilled to disk. The directions, templates and offsets of each appended bundle are written
+to flat binary files which are memory-mapped on access, so only an index of offsets into the files is held in RAM.
+Bundles are rebuilt lazily on __getitem__ and __iter__; rebuilt bundles keep their templates and strategy
+assignments but not the labels of their directions. The files are deleted when the store is closed or collected.
+"""
+class DiskBundleStore:
+
+    """
+    @params model: Model the bundles are defined over
+            spill_dir: directory to create the spill files in, defaults to the system temporary directory
+    """
+    def __init__(self, model, spill_dir=None):
+        self.model = model
+        self.dim = model.dim
+        self.path = tempfile.mkdtemp(prefix='kaa_flowpipe_', dir=spill_dir)
+
+        self.float_file = open(os.path.join(self.path, 'float.dat'), 'ab')
+        self.int_file = open(os.path.join(self.path, 'int.dat'), 'ab')
+        self.float_map = self.int_map = None
+        self.float_len = self.int_len = 0
+
+        'Per bundle: (float start, int start, number of directions, number of templates) and strategy ids.'
+        self.index = []
+        self.strat_temp_ids = []
+
+        self.__finalizer = weakref.finalize(self, DiskBundleStore.__cleanup, self.float_file, self.int_file, self.path)
+
+    """
+    Spills a bundle to disk.
+    @params bund: Bundle object
+    """
+    def append(self, bund):
+        float_data = np.concatenate((bund.L.ravel(), bund.offu, bund.offl)).astype(float)
+        int_data = np.concatenate((bund.T.ravel(), bund.temp_strat_ids)).astype(np.int64)
+
+        self.index.append((self.float_len, self.int_len, bund.num_dir, bund.num_temp))
+        self.strat_temp_ids.append(bund.strat_temp_id)
+
+        self.float_file.write(float_data.tobytes())
+        self.int_file.write(int_data.tobytes())
+        self.float_len += len(float_data)
+        self.int_len += len(int_data)
+
+    """
+    Rebuilds the bundle stored at the input step.
+    """
+    def __load(self, step):
+        float_start, int_start, num_dir, num_temp = self.index[step]
+        float_map, int_map = self.__maps()
+        dim = self.dim
+
+        float_data = float_map[float_start:float_start + num_dir * (dim + 2)]
+        int_data = int_map[int_start:int_start + num_temp * (dim + 1)]
+
+        L = float_data[:num_dir * dim].reshape(num_dir, dim)
+        offu = float_data[num_dir * dim:num_dir * (dim + 1)]
+        offl = float_data[num_dir * (dim + 1):]
+        T = int_data[:num_temp * dim].reshape(num_temp, dim)
+
+        bund = Bundle(self.model, T, L, offu, offl)
+        bund.temp_strat_ids = np.array(int_data[num_temp * dim:])
+        bund.strat_temp_id = dict(self.strat_temp_ids[step])
+        bund.num_strat = max(bund.strat_temp_id.values(), default=1)
+
+        return bund
+
+    """
+    Returns memory maps covering everything written so far, remapping only when the files have grown.
+    """
+    def __maps(self):
+        if self.float_map is None or len(self.float_map) < self.float_len:
+            self.float_file.flush()
+            self.int_file.flush()
+
+            self.float_map = np.memmap(self.float_file.name, dtype=float, mode='r', shape=(self.float_len,))
+            self.int_map = np.memmap(self.int_file.name, dtype=np.int64, mode='r', shape=(self.int_len,))
+
+        return self.float_map, self.int_map
+
+    """
+    Deletes the spill files.
+    """
+    def close(self):
+        self.float_map = self.int_map = None
+        self.__finalizer()
+
+    @staticmethod
+    def __cleanup(float_file, int_file, path):
+        float_file.close()
+        int_file.close()
+        shutil.rmtree(path, ignore_errors=True)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ self.__load(step) for step in range(*index.indices(len(self))) ]
+
+        return self.__load(range(len(self))[index])
+
+    def __iter__(self):
+        return (self.__load(step) for step in range(len(self)))
+
+    def __len__(self):
+        return len(self.index)
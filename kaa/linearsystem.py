@@ -1,13 +1,13 @@
-import random as rand
 import numpy as np
-import multiprocessing as mp
 
 from operator import mul
 from functools import reduce
 from itertools import product
-from kaa.lputil import minLinProg, maxLinProg
+from scipy.stats import qmc
+from scipy.spatial import HalfspaceIntersection, ConvexHull
+from kaa.lputil import minLinProg, maxLinProg, lp_session
 from kaa.settings import KaaSettings
-from kaa.trajectory import Traj, TrajCollection
+from kaa.trajectory import TrajCollection
 
 class ChebyCenter:
 
@@ -23,13 +23,23 @@ class LinearSystem:
         self.model = model
         self.vars = model.vars
         self.dim = model.dim
+        self._volume = None
+        self._exact_volume = None
+        self._cheby_center = None
+        self._envelop_box = None
 
     """
-    Computes and returns the Chebyshev center of parallelotope.
+    Computes and returns the Chebyshev center of parallelotope. The center is cached on the system.
     @returns self.dim point marking the Chebyshev center.
     """
     @property
     def chebyshev_center(self):
+        if self._cheby_center is None:
+            self._cheby_center = self.__calc_cheby_center()
+
+        return self._cheby_center
+
+    def __calc_cheby_center(self):
 
         'Initialize objective function for Chebyshev intersection LP routine.'
         c = [0 for _ in range(self.dim + 1)]
@@ -42,23 +52,87 @@ class LinearSystem:
         return ChebyCenter(center_pt[:-1], center_pt[-1])
 
     """
-    Volume estimation of system by sampling points and taking ratio.
-    @params samples: number of samples used to estimate volume
+    Volume estimation of system by sampling points from its envelope box and taking the ratio of contained points.
+    Points are drawn in batches of KaaSettings.VolumeBatchSize from the sequence named by KaaSettings.VolumeSampler
+    until at least KaaSettings.VolumeSamples points are used or the estimated relative error drops below KaaSettings.VolumeTargetError.
+    The estimate is cached on the system.
     @returns estimated volume of linear system
     """
     @property
     def volume(self):
-        envelop_box = self.__calc_envelop_box()
-        num_contained_points = 0
-        num_samples = KaaSettings.VolumeSamples
+        if self._volume is None:
+            self._volume = self.__estimate_volume()
+
+        return self._volume
+
+    """
+    Exact volume of the system through vertex enumeration. The vertices are found by intersecting the halfspaces
+    around the Chebyshev center and the volume is that of their convex hull. Meant for low dimensions, since the
+    number of vertices grows quickly with the dimension.
+    @returns volume of linear system
+    """
+    @property
+    def exact_volume(self):
+        if self._exact_volume is None:
+            self._exact_volume = self.__calc_exact_volume()
+
+        return self._exact_volume
+
+    def __calc_exact_volume(self):
+        chebycenter = self.chebyshev_center
+        if chebycenter.radius <= 0:
+            return 0.0
+
+        if self.dim == 1:
+            envelop_box = self.__calc_envelop_box()
+            return envelop_box[0][1] - envelop_box[0][0]
+
+        halfspaces = np.column_stack((self.A, -np.asarray(self.b, dtype=float)))
+        vertices = HalfspaceIntersection(halfspaces, np.asarray(chebycenter.center, dtype=float)).intersections
 
-        for _ in range(num_samples):
-            point = self.__sample_box_point(envelop_box)
+        return ConvexHull(vertices).volume
 
-            if self.check_membership(point):
-                num_contained_points += 1
+    def __estimate_volume(self):
+        envelop_box = np.asarray(self.__calc_envelop_box())
+        box_vol = self.__calc_box_volume(envelop_box)
 
-        return (num_contained_points / num_samples) * self.__calc_box_volume(envelop_box)
+        if box_vol <= 0:
+            return 0.0
+
+        sampler = self.__volume_sampler()
+        target_err = KaaSettings.VolumeTargetError
+        num_contained_points = num_samples = 0
+
+        'Only whole batches are drawn so that every Sobol draw keeps its power-of-two balance.'
+        batch_size = KaaSettings.VolumeBatchSize
+        while num_samples < KaaSettings.VolumeSamples:
+            points = envelop_box[:,0] + sampler(batch_size) * (envelop_box[:,1] - envelop_box[:,0])
+
+            num_contained_points += np.count_nonzero(self.contains(points))
+            num_samples += batch_size
+
+            'Stop once the binomial standard error of the contained ratio is small relative to the ratio.'
+            ratio = num_contained_points / num_samples
+            if target_err is not None and ratio > 0 and np.sqrt(ratio * (1 - ratio) / num_samples) <= target_err * ratio:
+                break
+
+        return (num_contained_points / num_samples) * box_vol
+
+    """
+    Returns a function drawing batches of points from the unit box according to KaaSettings.VolumeSampler.
+    """
+    def __volume_sampler(self):
+        sampler_name = KaaSettings.VolumeSampler
+        seed = np.random.randint(2**32 - 1)
+
+        if sampler_name == 'sobol':
+            return qmc.Sobol(d=self.dim, seed=seed).random
+        if sampler_name == 'halton':
+            return qmc.Halton(d=self.dim, seed=seed).random
+
+        assert sampler_name == 'random', f"Unknown volume sampler: {sampler_name}"
+        rng = np.random.default_rng(seed)
+        return lambda num_points: rng.random((num_points, self.dim))
 
     """
     Maxmize optimization function y over Ax \leq b
@@ -78,6 +152,43 @@ class LinearSystem:
         assert len(y) == self.dim, "Linear optimization function must be of same dimension as system."
         return minLinProg(y,self.A, self.b)
 
+    """
+    Opens a persistent LP session over Ax \leq b for solving many objectives against the same constraints.
+    Use as a context manager so the GLPK problem is released afterwards.
+    @returns LPSession
+    """
+    def lp_session(self):
+        return lp_session(self.A, self.b)
+
+    """
+    Evaluates the support function of Ax \leq b along every row of D i.e max_{x} d^T x for each direction d.
+    If the vertices of the system are known, the supports are read off the vertices directly.
+    Otherwise all directions are solved against one LP session.
+    @params D: matrix whose rows are the directions
+    @returns array of support values, matrix whose rows are the corresponding maximizers.
+    """
+    def support(self, D):
+        D = np.atleast_2d(np.asarray(D, dtype=float))
+        assert D.shape[1] == self.dim, "Directions must be of same dimension as system."
+
+        vertices = self.vertices
+        if vertices is not None:
+            vals = D @ vertices.T
+            max_idx = np.argmax(vals, axis=1)
+            return vals[np.arange(len(D)), max_idx], vertices[max_idx]
+
+        with self.lp_session() as lp:
+            sols = [ lp.max(row) for row in D ]
+
+        return np.array([ sol.fun for sol in sols ]), np.array([ sol.x for sol in sols ])
+
+    """
+    Vertices of the system as rows of a matrix, or None if they are not known without enumeration.
+    """
+    @property
+    def vertices(self):
+        return None
+
     """
     Checks if point is indeed contained in Ax \leq b
     @params point: point to test
@@ -85,83 +196,57 @@ class LinearSystem:
     """
     def check_membership(self, point):
         assert len(point) == self.dim, "Point must be of the same dimension as system."
-        
-        for row_idx, row in enumerate(self.A):
-            if np.dot(row, point) > self.b[row_idx]:
-                return False
-        return True
+        return bool(self.contains(np.asarray(point)[None, :])[0])
 
     """
-    Calculate the enveloping box over the linear system
+    Checks which of a batch of points are contained in Ax \leq b
+    @params points: (N x dim) array of points
+    @returns boolean array of length N indicating membership.
+    """
+    def contains(self, points):
+        return np.all(points @ np.asarray(self.A, dtype=float).T <= self.b, axis=1)
+
+    """
+    Calculate the enveloping box over the linear system. The box is cached on the system.
     @params model: input model
     @returns list of intervals representing edges of box.
     """
     def __calc_envelop_box(self):
-        box_interval = []
-        for i in range(self.dim):
-
-            y = [0 for _ in range(self.dim)]
-            y[i] = 1
+        if self._envelop_box is None:
+            self._envelop_box = self.__support_box()
 
-            maxCood = self.max_opt(y).fun
-            minCood = self.min_opt(y).fun
-            box_interval.append([minCood, maxCood])
+        return self._envelop_box
 
-        return box_interval
+    def __support_box(self):
+        vals, _ = self.support(np.vstack((np.eye(self.dim), -np.eye(self.dim))))
+        return [ [-min_cood, max_cood] for max_cood, min_cood in zip(vals[:self.dim], vals[self.dim:]) ]
 
     def __calc_box_volume(self, box_intervals):
         box_dim = [end - start for start,end in box_intervals]
         return reduce(mul, box_dim)
 
-    """
-    Sample a random point contained within a box.
-    @params box_intervals: list of lists defining box
-    @returns random point sampled within box
-    """
-    def __sample_box_point(self, box_intervals):
-        assert len(box_intervals) == self.dim, "Number of intervals defining box must match dimension of system."
-
-        return [ rand.uniform(start, end) for start, end in box_intervals ]
-
     """
     Generate random trajectories from polytope defined by parallelotope bundle.
-    @params model: Model
-            num_traj: umber of trajectories to generate.
+    All trajectories are propagated together through the vectorized dynamics of the model.
+    @params num_traj: umber of trajectories to generate.
             time_steps: number of time steps to generate trajs.
-    @returns list of Traj objects representing num random trajectories.
+    @returns TrajCollection object holding num random trajectories.
     """
     def generate_traj(self, num_trajs, time_steps):
         initial_points = self.gen_ran_pts_box(num_trajs)
-        trajs = [ Traj(self.model, point, steps=time_steps) for point in initial_points ]
-
-        """
-        if KaaSettings.use_parallel:
-            'Parallelize point propagation'
-            p = mp.Pool(processes=4)
-            prop_trajs = p.starmap(point_prop, [ (model, point, time_steps) for point in initial_points ])
-            p.close()
-            p.join()
-        """
-
-        return TrajCollection(trajs)
+        return TrajCollection.simulate(self.model, initial_points, time_steps)
 
     """
     Generates random points contained within the tightest enveloping parallelotope of the Chevyshev sphere.
     @params bund: Bundle object
             num_trajs: number of trajs to generate
             shrinkfactor: factor to shrink the radius of the sphere. This allows a box with smaller dimensions
-    @returns list of generated random points.
+    @returns (num_trajs x dim) array of generated random points.
     """
     def gen_ran_pts_box(self, num_trajs, shrinkfactor=1):
         chebycenter = self.chebyshev_center
 
-        center = chebycenter.center
+        center = np.asarray(chebycenter.center, dtype=float)
         radius = chebycenter.radius
 
-        box_intervals = [[c - (radius*shrinkfactor), c + (radius*shrinkfactor)] for c in center]
-
-        gen_points = []
-        for _ in range(num_trajs):
-            gen_points.append([rand.uniform(bound[0], bound[1]) for bound in box_intervals])
-
-        return gen_points
+        return np.random.uniform(center - radius*shrinkfactor, center + radius*shrinkfactor, size=(num_trajs, self.dim))
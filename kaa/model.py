@@ -1,6 +1,13 @@
+import hashlib
+import os
+import tempfile
+import numpy as np
+import sympy as sp
+
 from kaa.opts.kodiak import KodiakProd
 from kaa.settings import KaaSettings
 from kaa.bundle import Bundle
+from kaa.polynomial import Polynomial, PolyMap
 
 if KaaSettings.OptProd is KodiakProd:
     from kaa.pykodiak.pykodiak_interface import Kodiak
@@ -9,13 +16,6 @@ class Model:
 
     def __init__(self, f, vars, T, L, offu, offl, name="Model", compose=0):
 
-        for _ in range(compose):
-            var_sub = [ (var, f[var_idx]) for var_idx, var in enumerate(vars) ]
-            f = [ func.subs(var_sub, simultaneous=True) for func in f ]
-
-        'List of system dynamics.'
-        self.f = f
-
         'List of system variables.'
         self.vars = vars
 
@@ -25,6 +25,22 @@ class Model:
         'Name of system.'
         self.name = name
 
+        'Dynamics compiled into numeric sparse polynomials. None if the dynamics are not polynomial.'
+        self.f_poly = self.__compile_dynamics(f)
+        self._f_lambda = None
+
+        'Each composition substitutes the dynamics into themselves, doubling the number of steps of the map.'
+        if compose and self.f_poly is not None:
+            self.f_poly = self.__compose_dynamics(compose)
+            f = None
+        else:
+            for _ in range(compose):
+                var_sub = [ (var, f[var_idx]) for var_idx, var in enumerate(vars) ]
+                f = [ func.subs(var_sub, simultaneous=True) for func in f ]
+
+        'List of system dynamics. Numerically composed dynamics are converted back to sympy on first use.'
+        self._f = f
+
         'Initial bundle.'
         self.bund = Bundle(self, T, L, offu, offl)
 
@@ -32,5 +48,85 @@ class Model:
             for var in self.vars:
                 Kodiak.add_variable(str(var))
 
+    @property
+    def f(self):
+        if self._f is None:
+            self._f = [ poly.to_sympy(self.vars) for poly in self.f_poly ]
+
+        return self._f
+
+    """
+    Vectorized dynamics mapping an (N x dim) array of points to the (N x dim) array of their images.
+    Uses the compiled PolyMap when available and a NumPy lambdification of self.f otherwise.
+    """
+    @property
+    def f_vec(self):
+        if self.f_poly is not None:
+            return self.f_poly.eval
+
+        if self._f_lambda is None:
+            f_lambda = sp.lambdify(self.vars, self.f, 'numpy')
+            self._f_lambda = lambda points: np.column_stack(np.broadcast_arrays(*f_lambda(*points.T)))
+
+        return self._f_lambda
+
+    'The lambdified dynamics cannot be pickled; workers rebuild them on first use.'
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_f_lambda'] = None
+        return state
+
+    """
+    Compiles the sympy dynamics into a PolyMap once so the reachability loop can
+    compose them numerically.
+    @params f: list of sympy expressions
+    @returns PolyMap object or None if the dynamics are not polynomial.
+    """
+    def __compile_dynamics(self, f):
+        try:
+            return PolyMap.from_sympy(f, self.vars)
+        except (sp.PolynomialError, TypeError):
+            return None
+
+    """
+    Composes the compiled dynamics with themselves compose times. The expanded coefficients are cached on disk,
+    keyed by the model name, the number of compositions and a hash of the dynamics.
+    @params compose: number of compositions
+    @returns composed PolyMap object
+    """
+    def __compose_dynamics(self, compose):
+        cache_path = None
+        if KaaSettings.CacheComposition:
+            digest = hashlib.sha1(str(compose).encode())
+            for poly in self.f_poly:
+                digest.update(poly.exps.tobytes())
+                digest.update(poly.coeffs.tobytes())
+
+            cache_dir = KaaSettings.CompositionCacheDir or os.path.join(tempfile.gettempdir(), 'kaa_compose')
+            cache_path = os.path.join(cache_dir, f"{self.name}_{compose}_{digest.hexdigest()[:16]}.npz")
+
+            if os.path.exists(cache_path):
+                with np.load(cache_path) as cached:
+                    return PolyMap([ Polynomial(cached[f'exps_{idx}'], cached[f'coeffs_{idx}'], self.dim) for idx in range(self.dim) ])
+
+        f_poly = self.f_poly
+        for _ in range(compose):
+            f_poly = PolyMap(f_poly.compose(f_poly.polys))
+
+        if cache_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            arrays = {}
+            for idx, poly in enumerate(f_poly):
+                arrays[f'exps_{idx}'] = poly.exps
+                arrays[f'coeffs_{idx}'] = poly.coeffs
+
+            'Write to a temporary file first so concurrent runs never read a partial cache.'
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.npz')
+            with os.fdopen(fd, 'wb') as tmp_file:
+                np.savez(tmp_file, **arrays)
+            os.replace(tmp_path, cache_path)
+
+        return f_poly
+
     def __str__(self):
         return self.name
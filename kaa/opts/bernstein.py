@@ -1,16 +1,20 @@
-import sympy as sp
+import numpy as np
 
-from functools import reduce
-from math import factorial
+from contextlib import contextmanager
+from functools import reduce, lru_cache
+from math import factorial, comb
 from operator import mul,add
 from itertools import product
 from kaa.opts.optprod import OptimizationProd
+from kaa.polynomial import Polynomial
 
 class BernsteinProd(OptimizationProd):
 
+    accepts_compiled = True
+
     def __init__(self, poly, bund):
         super().__init__(poly, bund)
-        self.poly = sp.Poly(poly, self.vars)
+        self.poly = poly if isinstance(poly, Polynomial) else Polynomial.from_sympy(poly, self.vars)
         self.var_num = len(self.vars)
         self.degree = self._getDegree()
 
@@ -47,7 +51,7 @@ class BernsteinProd(OptimizationProd):
                 coeff_mul_list.append(j_coeff)
 
             bern_coef = reduce(mul,coeff_mul_list)
-            poly_coef = self.poly.coeff_monomial(self._getMonom(j))
+            poly_coef = self.poly.coeff(j)
             bern_sum_list.append(bern_coef * poly_coef)
 
         return reduce(add, bern_sum_list)
@@ -65,35 +69,370 @@ class BernsteinProd(OptimizationProd):
         return list(product(*iterators))
 
     """
-    Returns the total degree of self.poly
+    Returns the degree of self.poly in each variable.
     """
     def _getDegree(self):
+        return list(self.poly.degree)
+
+    """
+    Calculates n choose r
+    @params n: n
+            r: r
+    """
+    def _choose(self, n, r):
+        return factorial(n) // (factorial(r)*factorial(n-r))
+
+"""
+Bernstein bounding on the dense coefficient tensor of the polynomial.
+The Bernstein coefficients are obtained with one matrix transform per axis,
+
+b_{i} = sum_{j <= i} prod_k C(i_k, j_k) / C(d_k, j_k) * a_{j},
+
+where the per-axis binomial-ratio matrices are cached by degree.
+
+With subdivide set, the coefficient bounds are refined by de Casteljau subdivision until the vertex test
+proves them exact up to precision or max_subdivisions splits have been spent on the bound.
+"""
+class BernsteinTensorProd(OptimizationProd):
 
-        monom_tups = self.poly.monoms()
-        degree = []
+    accepts_compiled = True
 
-        for var_index, _ in enumerate(self.vars):
-             var_deg = max([ monom[var_index] for monom in monom_tups])
-             degree.append(var_deg)
+    'Refine the bounds by subdividing the unit box.'
+    subdivide = False
 
-        return degree
+    'Absolute gap between a bound and the best vertex coefficient at which the bound is accepted.'
+    precision = 1e-6
+
+    'Maximum number of subdivisions spent on each bound.'
+    max_subdivisions = 32
+
+    'Refinement done during the current step.'
+    _step_stats = {'subdivisions': 0, 'unresolved': 0}
+
+    'Largest dense coefficient tensor. Larger polynomials are bounded by SparseBernsteinProd.'
+    max_dense_coeffs = 2**20
+
+    def __init__(self, poly, bund):
+        super().__init__(poly, bund)
+        self.poly = poly if isinstance(poly, Polynomial) else Polynomial.from_sympy(poly, self.vars)
+        self.degree = tuple(self.poly.degree)
+        self.coeff_tensor = self.poly.to_dense(self.degree) if self.__is_dense(self.degree) else None
 
     """
-    Returns the sympy monomial of specific degree.
-    @params j: degree of monomial.
+    Computes and returns the maximum and minimum Bernstein coefficients for self.poly.
     """
-    def _getMonom(self, j):
+    def getBounds(self):
+        if self.coeff_tensor is None:
+            return SparseBernsteinProd(self.poly, self.bund).getBounds()
+
+        bern_coeff = bern_transform(self.coeff_tensor)
 
-        var_monom = [ self.vars[i]**j[i] for i in range(self.var_num) ]
-        expr = reduce(mul, var_monom)
+        if self.subdivide:
+            return self.__refine(bern_coeff)
 
-        monomial = sp.Poly(expr, self.vars)
-        return monomial.as_expr()
+        return bern_coeff.max(), bern_coeff.min()
 
     """
-    Calculates n choose r
-    @params n: n
-            r: r
+    Bounds every direction of a parallelotope at once. The Bernstein transform is linear, so the
+    coefficient tensor of each component of fog is computed once and every direction's coefficients
+    are the weighted sum of those tensors. All components are expanded at their common degree, which
+    only tightens the bounds through degree elevation.
     """
-    def _choose(self, n, r):
-        return factorial(n) // (factorial(r)*factorial(n-r))
+    @classmethod
+    def getDirBounds(cls, fog, dir_mat, bund):
+        polys = [ func if isinstance(func, Polynomial) else Polynomial.from_sympy(func, bund.vars) for func in fog ]
+        degree = np.max([ poly.degree for poly in polys ], axis=0)
+
+        if not cls.__is_dense(degree):
+            return SparseBernsteinProd.getDirBounds(polys, dir_mat, bund)
+
+        bern_tensors = np.stack([ bern_transform(poly.to_dense(degree)) for poly in polys ])
+        dir_bern = np.tensordot(dir_mat, bern_tensors, axes=(1, 0))
+
+        if cls.subdivide:
+            bounds = [ cls.__refine(bern_tensor) for bern_tensor in dir_bern ]
+            ub, lb = zip(*bounds)
+            return np.asarray(ub), np.asarray(lb)
+
+        dir_bern = dir_bern.reshape(len(dir_mat), -1)
+        return dir_bern.max(axis=1), dir_bern.min(axis=1)
+
+    @classmethod
+    def __is_dense(cls, degree):
+        return np.prod([ d + 1 for d in degree ], dtype=float) <= cls.max_dense_coeffs
+
+    """
+    Resets the refinement statistics at the start of a bundle transformation.
+    """
+    @classmethod
+    @contextmanager
+    def step_scope(cls):
+        cls._step_stats = {'subdivisions': 0, 'unresolved': 0}
+        yield
+
+    """
+    Reports the number of subdivisions made during the last step and the number of bounds
+    whose subdivision budget ran out before the vertex test succeeded.
+    """
+    @classmethod
+    def step_report(cls):
+        return dict(cls._step_stats) if cls.subdivide else None
+
+    """
+    Refines the maximum and minimum Bernstein coefficients of bern_tensor through subdivision.
+    """
+    @classmethod
+    def __refine(cls, bern_tensor):
+        ub = subdivide_max(bern_tensor, cls.precision, cls.max_subdivisions)
+        lb = subdivide_max(-bern_tensor, cls.precision, cls.max_subdivisions)
+
+        for num_splits, exact in (ub[1:], lb[1:]):
+            cls._step_stats['subdivisions'] += num_splits
+            cls._step_stats['unresolved'] += not exact
+
+        return ub[0], -lb[0]
+
+"""
+Bernstein bounding from the monomial support of the polynomial, for models whose dense coefficient tensor
+is too large to build. Every Bernstein coefficient is a sum over the monomials a_j x^j of
+
+a_j prod_{k : j_k > 0} C(i_k, j_k) / C(d_k, j_k),
+
+which only depends on the indices i_k of the variables in the monomial. The monomials are grouped into
+factor tables by their variables and the extreme coefficients are found by eliminating the variables one at
+a time (max-sum variable elimination), so only tables over variables sharing monomials are enumerated.
+A bucket whose combined table would exceed max_table_size entries is split and its parts are eliminated
+separately, which bounds the remaining coefficients implicitly at the cost of looser bounds.
+"""
+class SparseBernsteinProd(OptimizationProd):
+
+    accepts_compiled = True
+
+    'Largest factor table built during elimination.'
+    max_table_size = 2**16
+
+    def __init__(self, poly, bund):
+        super().__init__(poly, bund)
+        self.poly = poly if isinstance(poly, Polynomial) else Polynomial.from_sympy(poly, self.vars)
+        self.degree = tuple(self.poly.degree)
+
+        'Were the last bounds the exact extreme Bernstein coefficients?'
+        self.exact = True
+
+    """
+    Computes and returns the maximum and minimum Bernstein coefficients for self.poly.
+    """
+    def getBounds(self):
+        const, factors = factor_tables(self.poly, self.degree)
+
+        ub, ub_exact = eliminate(const, factors, self.degree, np.max, self.max_table_size)
+        lb, lb_exact = eliminate(const, factors, self.degree, np.min, self.max_table_size)
+        self.exact = ub_exact and lb_exact
+
+        return ub, lb
+
+    """
+    Bounds every direction of a parallelotope. The factor tables are linear in the polynomial, so the
+    tables of each component of fog are built once at the common degree and summed with each direction's weights.
+    """
+    @classmethod
+    def getDirBounds(cls, fog, dir_mat, bund):
+        polys = [ func if isinstance(func, Polynomial) else Polynomial.from_sympy(func, bund.vars) for func in fog ]
+        degree = tuple(np.max([ poly.degree for poly in polys ], axis=0))
+        comp_tables = [ factor_tables(poly, degree) for poly in polys ]
+
+        ub, lb = np.empty(len(dir_mat)), np.empty(len(dir_mat))
+        for dir_idx, dir_vec in enumerate(dir_mat):
+            const, factors = 0.0, {}
+            for weight, (comp_const, comp_factors) in zip(dir_vec, comp_tables):
+                if not weight:
+                    continue
+
+                const += weight * comp_const
+                for scope, table in comp_factors.items():
+                    factors[scope] = factors[scope] + weight * table if scope in factors else weight * table
+
+            ub[dir_idx] = eliminate(const, factors, degree, np.max, cls.max_table_size)[0]
+            lb[dir_idx] = eliminate(const, factors, degree, np.min, cls.max_table_size)[0]
+
+        return ub, lb
+
+"""
+Transforms a dense monomial coefficient tensor into the tensor of Bernstein coefficients
+over the unit box. The degree along each axis is read off the tensor's shape.
+@params coeff_tensor: ndarray of shape (d_1+1, ..., d_n+1)
+@returns ndarray of Bernstein coefficients of the same shape.
+"""
+def bern_transform(coeff_tensor):
+    bern_tensor = coeff_tensor
+
+    for axis, axis_len in enumerate(coeff_tensor.shape):
+        if axis_len > 1:
+            trans = np.tensordot(_bern_matrix(axis_len - 1), bern_tensor, axes=(1, axis))
+            bern_tensor = np.moveaxis(trans, 0, axis)
+
+    return bern_tensor
+
+"""
+Lower-triangular matrix of binomial ratios M[i][j] = C(i,j) / C(deg,j) for a single axis.
+"""
+@lru_cache(maxsize=None)
+def _bern_matrix(deg):
+    bern_mat = np.zeros((deg+1, deg+1))
+
+    for i in range(deg+1):
+        for j in range(i+1):
+            bern_mat[i][j] = comb(i, j) / comb(deg, j)
+
+    return bern_mat
+
+"""
+Bounds the maximum of a polynomial over the unit box from its Bernstein coefficients, subdividing the
+box with the largest coefficient until the bound is within precision of the largest vertex coefficient.
+Vertex coefficients are values of the polynomial at box corners, so the bound is then exact up to precision.
+Boxes whose coefficients all lie below the best vertex coefficient are dropped.
+@params bern_tensor: Bernstein coefficient tensor over the unit box
+        precision: absolute tolerance of the vertex test
+        max_subdivisions: maximum number of subdivisions
+@returns upper bound, number of subdivisions, whether the vertex test succeeded
+"""
+def subdivide_max(bern_tensor, precision, max_subdivisions):
+    boxes = [ bern_tensor ]
+    box_max = [ bern_tensor.max() ]
+    best_val = _corners(bern_tensor).max()
+
+    for num_splits in range(max_subdivisions + 1):
+        top = int(np.argmax(box_max))
+        if box_max[top] - best_val <= precision:
+            return box_max[top], num_splits, True
+
+        if num_splits == max_subdivisions:
+            return box_max[top], num_splits, False
+
+        box = boxes.pop(top)
+        box_max.pop(top)
+
+        for child in de_casteljau(box, _widest_axis(box)):
+            best_val = max(best_val, _corners(child).max())
+            boxes.append(child)
+            box_max.append(child.max())
+
+        live = [ idx for idx, val in enumerate(box_max) if val > best_val ]
+        boxes = [ boxes[idx] for idx in live ]
+        box_max = [ box_max[idx] for idx in live ]
+
+        if not boxes:
+            return best_val, num_splits + 1, True
+
+"""
+Splits a Bernstein coefficient tensor at the midpoint of one axis with the de Casteljau algorithm.
+@params bern_tensor: Bernstein coefficient tensor
+        axis: axis to split
+@returns coefficient tensors of the lower and upper halves.
+"""
+def de_casteljau(bern_tensor, axis):
+    coeffs = np.moveaxis(bern_tensor, axis, 0)
+    deg = len(coeffs) - 1
+
+    left, right = np.empty_like(coeffs), np.empty_like(coeffs)
+    left[0], right[deg] = coeffs[0], coeffs[deg]
+
+    for step in range(1, deg + 1):
+        coeffs = (coeffs[:-1] + coeffs[1:]) / 2
+        left[step], right[deg - step] = coeffs[0], coeffs[-1]
+
+    return np.moveaxis(left, 0, axis), np.moveaxis(right, 0, axis)
+
+"""
+Returns the axis along which the Bernstein coefficients vary the most.
+"""
+def _widest_axis(bern_tensor):
+    variation = [ np.abs(np.diff(bern_tensor, axis=axis)).max() if axis_len > 1 else -1
+                  for axis, axis_len in enumerate(bern_tensor.shape) ]
+
+    return int(np.argmax(variation))
+
+"""
+Returns the coefficients at the corners of the tensor, which equal the values of the polynomial at the box corners.
+"""
+def _corners(bern_tensor):
+    return bern_tensor[tuple(slice(None, None, max(axis_len - 1, 1)) for axis_len in bern_tensor.shape)]
+
+"""
+Splits the Bernstein coefficients of a polynomial into factor tables. The table of a set of variables holds,
+for every combination of their Bernstein indices, the contribution of the monomials over exactly those variables.
+@params poly: Polynomial
+        degree: per-variable degrees of the Bernstein expansion
+@returns constant term, dictionary from sorted tuples of variable indices to their tables
+"""
+def factor_tables(poly, degree):
+    const = 0.0
+    factors = {}
+
+    for exp, coeff in zip(poly.exps, poly.coeffs):
+        scope = tuple(np.flatnonzero(exp).tolist())
+        if not scope:
+            const += coeff
+            continue
+
+        table = coeff * reduce(np.multiply.outer, [ _bern_matrix(degree[var])[:, exp[var]] for var in scope ])
+        factors[scope] = factors[scope] + table if scope in factors else table
+
+    return const, factors
+
+"""
+Computes the extreme Bernstein coefficient of the sum of the factor tables by eliminating one variable at a time.
+The next variable is the one whose bucket has the smallest combined table. Buckets whose combined table would
+exceed max_table_size entries are split into parts eliminated separately, which yields a sound but looser bound.
+@params const: constant term
+        factors: dictionary from sorted tuples of variable indices to tables
+        degree: per-variable degrees
+        reduce_op: np.max or np.min
+        max_table_size: largest table built
+@returns extreme coefficient bound, whether no bucket was split.
+"""
+def eliminate(const, factors, degree, reduce_op, max_table_size):
+    factors = list(factors.items())
+    domain = lambda scope: np.prod([ degree[var] + 1 for var in scope ], dtype=float)
+    exact = True
+
+    while factors:
+        scope_vars = set().union(*(scope for scope, _ in factors))
+        bucket_scope = lambda var: set().union(*(scope for scope, _ in factors if var in scope))
+        var = min(scope_vars, key=lambda var: domain(bucket_scope(var)))
+
+        bucket = sorted((factor for factor in factors if var in factor[0]), key=lambda factor: -len(factor[1].flat))
+        factors = [ factor for factor in factors if var not in factor[0] ]
+
+        'Group the bucket into parts whose combined tables stay within max_table_size.'
+        parts = []
+        for scope, table in bucket:
+            for part in parts:
+                if domain(part[0] | set(scope)) <= max_table_size:
+                    part[0].update(scope)
+                    part[1].append((scope, table))
+                    break
+            else:
+                parts.append((set(scope), [(scope, table)]))
+
+        exact = exact and len(parts) == 1
+
+        for part_scope, part_factors in parts:
+            union = tuple(sorted(part_scope))
+            combined = sum(_broadcast_table(scope, table, union) for scope, table in part_factors)
+            reduced = reduce_op(combined, axis=union.index(var))
+
+            new_scope = tuple(v for v in union if v != var)
+            if new_scope:
+                factors.append((new_scope, reduced))
+            else:
+                const += float(reduced)
+
+    return const, exact
+
+"""
+Reshapes a table over scope so that it broadcasts against tables over the sorted superset union.
+"""
+def _broadcast_table(scope, table, union):
+    shape = [ table.shape[scope.index(var)] if var in scope else 1 for var in union ]
+    return table.reshape(shape)
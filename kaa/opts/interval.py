@@ -0,0 +1,214 @@
+import numpy as np
+import sympy as sp
+
+from kaa.opts.optprod import OptimizationProd
+from kaa.polynomial import Polynomial
+
+"""
+Optimization procedure bounding a function over the unit box through interval arithmetic and branch-and-bound.
+Supports the operators handled by the Kodiak bridge: sums, products, integer powers, sqrt, sin, cos and atan.
+Everything is evaluated on batches of boxes with NumPy, so no native library is required.
+Note that NumPy does not round outwards; the bounds are exact up to floating-point error.
+"""
+class IntervalProd(OptimizationProd):
+
+    accepts_compiled = True
+
+    'Stop refining once the gap between the bound and the best sampled value is below this value.'
+    precision = 1e-6
+
+    'Maximum number of refinement iterations for each bound.'
+    max_iters = 100
+
+    'Number of boxes bisected in every iteration.'
+    batch_size = 64
+
+    def __init__(self, poly, bund):
+        super().__init__(poly, bund)
+        self.dim = len(self.vars)
+
+        if isinstance(poly, Polynomial):
+            self.func = _compile_poly(poly)
+        else:
+            self.func = _compile_sympy(sp.sympify(poly), { var: idx for idx, var in enumerate(self.vars) })
+
+    """
+    Bounds the function over the unit box with branch-and-bound on the maximum and on the minimum.
+    """
+    def getBounds(self):
+        ub = self.__branch_and_bound(lambda lo, hi: self.func(lo, hi))
+        lb = -self.__branch_and_bound(lambda lo, hi: tuple(-val for val in reversed(self.func(lo, hi))))
+
+        return ub, lb
+
+    """
+    Computes an upper bound of the maximum of the interval function func over the unit box.
+    Each iteration bisects the batch_size boxes with the highest upper bounds along their widest side
+    and prunes every box whose upper bound falls below the best value found at a box midpoint.
+    @params func: function mapping (N x dim) arrays of box corners to arrays of lower and upper bounds
+    @returns upper bound on the maximum.
+    """
+    def __branch_and_bound(self, func):
+        box_lo, box_hi = np.zeros((1, self.dim)), np.ones((1, self.dim))
+        box_ub = func(box_lo, box_hi)[1]
+        best_val = self.__eval_mid(func, box_lo, box_hi).max()
+
+        for _ in range(self.max_iters):
+            if box_ub.max() - best_val <= self.precision:
+                break
+
+            'Split the most promising boxes along their widest side.'
+            order = np.argsort(-box_ub)
+            split, keep = order[:self.batch_size], order[self.batch_size:]
+
+            split_lo, split_hi = box_lo[split], box_hi[split]
+            split_dim = np.argmax(split_hi - split_lo, axis=1)
+            rows = np.arange(len(split))
+            mid = (split_lo[rows, split_dim] + split_hi[rows, split_dim]) / 2
+
+            left_hi = split_hi.copy()
+            left_hi[rows, split_dim] = mid
+            right_lo = split_lo.copy()
+            right_lo[rows, split_dim] = mid
+
+            child_lo = np.vstack((split_lo, right_lo))
+            child_hi = np.vstack((left_hi, split_hi))
+            child_ub = func(child_lo, child_hi)[1]
+            best_val = max(best_val, self.__eval_mid(func, child_lo, child_hi).max())
+
+            box_lo = np.vstack((box_lo[keep], child_lo))
+            box_hi = np.vstack((box_hi[keep], child_hi))
+            box_ub = np.concatenate((box_ub[keep], child_ub))
+
+            'Discard boxes which cannot contain the maximum.'
+            alive = box_ub >= best_val
+            box_lo, box_hi, box_ub = box_lo[alive], box_hi[alive], box_ub[alive]
+
+        return box_ub.max()
+
+    def __eval_mid(self, func, box_lo, box_hi):
+        mid = (box_lo + box_hi) / 2
+        return func(mid, mid)[0]
+
+"""
+Compiles a sympy expression into an interval function mapping (N x dim) arrays of box corners to
+the lower and upper bounds of the expression over each box.
+@params expr: sympy expression
+        var_idx: dictionary from sympy symbols to their column in the box arrays
+@returns interval function
+"""
+def _compile_sympy(expr, var_idx):
+
+    if isinstance(expr, sp.Symbol):
+        assert expr in var_idx, f"Unknown variable {expr} in {expr}"
+        col = var_idx[expr]
+        return lambda lo, hi: (lo[:, col], hi[:, col])
+
+    if isinstance(expr, sp.Number):
+        val = float(expr)
+        return lambda lo, hi: (np.full(len(lo), val), np.full(len(lo), val))
+
+    args = [ _compile_sympy(arg, var_idx) for arg in expr.args ]
+
+    if isinstance(expr, sp.Add):
+        return lambda lo, hi: _reduce_intervals(_iadd, [ arg(lo, hi) for arg in args ])
+
+    if isinstance(expr, sp.Mul):
+        return lambda lo, hi: _reduce_intervals(_imul, [ arg(lo, hi) for arg in args ])
+
+    if isinstance(expr, sp.Pow):
+        base, exponent = args[0], expr.args[1]
+        assert isinstance(exponent, sp.Number), f"exponent must be a number: {expr}"
+
+        if float(exponent) == 0.5:
+            return lambda lo, hi: _isqrt(*base(lo, hi))
+
+        assert float(exponent) == int(exponent), f"exponent must be an integer (or 0.5): {expr}"
+        return lambda lo, hi: _ipow(*base(lo, hi), int(exponent))
+
+    unary_ops = { sp.sin: _isin, sp.cos: _icos, sp.atan: _iatan }
+    for func_type, interval_op in unary_ops.items():
+        if isinstance(expr, func_type):
+            return lambda lo, hi: interval_op(*args[0](lo, hi))
+
+    raise NotImplementedError(f"Interval arithmetic for '{expr}' unsupported (type {type(expr)})")
+
+"""
+Compiles a Polynomial into an interval function. The interval powers of each variable are computed once
+per call and shared by every monomial.
+"""
+def _compile_poly(poly):
+    degree = poly.degree
+
+    def interval_poly(lo, hi):
+        num_boxes = len(lo)
+        total_lo, total_hi = np.zeros(num_boxes), np.zeros(num_boxes)
+        powers = [ [ _ipow(lo[:, var], hi[:, var], e) for e in range(deg + 1) ] for var, deg in enumerate(degree) ]
+
+        for exp, coeff in zip(poly.exps, poly.coeffs):
+            term = (np.full(num_boxes, coeff), np.full(num_boxes, coeff))
+            for var, e in enumerate(exp):
+                if e:
+                    term = _imul(term, powers[var][e])
+
+            total_lo, total_hi = _iadd((total_lo, total_hi), term)
+
+        return total_lo, total_hi
+
+    return interval_poly
+
+def _reduce_intervals(op, intervals):
+    result = intervals[0]
+    for interval in intervals[1:]:
+        result = op(result, interval)
+
+    return result
+
+def _iadd(a, b):
+    return a[0] + b[0], a[1] + b[1]
+
+def _imul(a, b):
+    prods = np.stack((a[0] * b[0], a[0] * b[1], a[1] * b[0], a[1] * b[1]))
+    return prods.min(axis=0), prods.max(axis=0)
+
+def _ipow(lo, hi, n):
+    if n == 0:
+        return np.ones_like(lo), np.ones_like(hi)
+
+    if n < 0:
+        return _irecip(*_ipow(lo, hi, -n))
+
+    lo_n, hi_n = lo ** n, hi ** n
+    if n % 2:
+        return lo_n, hi_n
+
+    'Even powers reach zero whenever the interval straddles it.'
+    straddle = (lo < 0) & (hi > 0)
+    return np.where(straddle, 0, np.minimum(lo_n, hi_n)), np.maximum(lo_n, hi_n)
+
+def _irecip(lo, hi):
+    contains_zero = (lo <= 0) & (hi >= 0)
+    with np.errstate(divide='ignore'):
+        return np.where(contains_zero, -np.inf, 1 / hi), np.where(contains_zero, np.inf, 1 / lo)
+
+def _isqrt(lo, hi):
+    return np.sqrt(np.maximum(lo, 0)), np.sqrt(np.maximum(hi, 0))
+
+def _iatan(lo, hi):
+    return np.arctan(lo), np.arctan(hi)
+
+def _isin(lo, hi):
+    sin_lo, sin_hi = np.sin(lo), np.sin(hi)
+    low, high = np.minimum(sin_lo, sin_hi), np.maximum(sin_lo, sin_hi)
+
+    'The extremes are attained wherever the interval contains a peak pi/2 + 2k*pi or a trough -pi/2 + 2k*pi.'
+    high = np.where(_contains_phase(lo, hi, np.pi / 2), 1, high)
+    low = np.where(_contains_phase(lo, hi, -np.pi / 2), -1, low)
+
+    return low, high
+
+def _icos(lo, hi):
+    return _isin(lo + np.pi / 2, hi + np.pi / 2)
+
+def _contains_phase(lo, hi, phase):
+    return np.ceil((lo - phase) / (2 * np.pi)) <= np.floor((hi - phase) / (2 * np.pi))
@@ -1,20 +1,51 @@
 import numpy as np
+from functools import lru_cache
 
 from kaa.pykodiak.pykodiak_interface import Kodiak
-from kaa.opts.optprod import OptimizationProd
+from kaa.opts.optprod import OptimizationProd, dir_poly
+from kaa.polynomial import Polynomial
 
 class KodiakProd(OptimizationProd):
 
+    accepts_compiled = True
+
+    'Number of native threads used to bound the directions of a parallelotope in one batched call.'
+    num_threads = 1
+
     def __init__(self, poly, bund):
         super().__init__(poly, bund)
-        self.kodiak_poly = Kodiak.sympy_to_kodiak(self.poly)
+
+        if isinstance(poly, Polynomial):
+            self.kodiak_poly = Kodiak.poly_to_kodiak(poly, [str(var) for var in self.vars])
+        else:
+            self.kodiak_poly = Kodiak.sympy_to_kodiak(self.poly)
     
-    def getBounds(self):
+    """
+    Every expression built during a bundle transformation lives in one Kodiak arena released at its end.
+    """
+    @classmethod
+    def step_scope(cls):
+        return Kodiak.arena()
 
-        'Unit box bounds'
-        bounds = [[0,1] for _ in range(self.bund.dim)]
-        jac_mat = np.zeros((self.bund.dim, self.bund.dim))
+    def getBounds(self):
+        lb, ub, _, _ = Kodiak.minmax_diff(self.kodiak_poly, _zero_approx(self.bund.dim), 0, _unit_box(self.bund.dim))
+        return ub, lb
 
-        lb, ub, _, _ = Kodiak.minmax_diff(self.kodiak_poly, jac_mat, 0, bounds)
+    """
+    Bounds every direction of a parallelotope with one batched Kodiak call over the unit box.
+    """
+    @classmethod
+    def getDirBounds(cls, fog, dir_mat, bund):
+        exp_indices = [ cls(dir_poly(dir_vec, fog), bund).kodiak_poly for dir_vec in dir_mat ]
+        lb, ub = Kodiak.minmax_batch(exp_indices, _unit_box(bund.dim), cls.num_threads)
 
         return ub, lb
+
+'Unit box bounds and zero linear approximation, shared by every call of the same dimension.'
+@lru_cache(maxsize=None)
+def _unit_box(dim):
+    return np.tile([0.0, 1.0], (dim, 1))
+
+@lru_cache(maxsize=None)
+def _zero_approx(dim):
+    return np.zeros(dim)
@@ -1,19 +1,72 @@
+import numpy as np
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
+
+from kaa.polynomial import Polynomial
 
 """
 Abstract pass to dictate that every optimization procedure must give an upper and lower bound.
-All polynomials passed in will be in sympy's format.
+All polynomials passed in will be in sympy's format unless the procedure sets accepts_compiled,
+in which case it may also receive kaa.polynomial.Polynomial objects.
 """
 class OptimizationProd(ABC):
 
+    'Can the procedure take compiled numeric Polynomials in place of sympy expressions?'
+    accepts_compiled = False
+
     def __init__(self, poly, bund):
         self.poly = poly
         self.bund = bund
         self.vars = bund.vars
 
+    """
+    Context manager scoping the resources the procedure allocates during one bundle transformation.
+    Does nothing by default.
+    """
+    @classmethod
+    def step_scope(cls):
+        return nullcontext()
+
+    """
+    Summary of the refinement the procedure made during the last step_scope, as a dictionary of counts.
+    None if the procedure does not refine its bounds.
+    """
+    @classmethod
+    def step_report(cls):
+        return None
+
     """
     All bounds must be returned as a tuple with the first element being the upper bound and the
     second element being the lower bound.
     """
     def getBounds(self):
         pass
+
+    """
+    Computes the bounds of the polynomial dir_vec * fog over the unit box for every row dir_vec of dir_mat.
+    The default implementation optimizes each direction separately. Procedures may override this to share
+    work between the directions of a parallelotope.
+    @params fog: list of composed dynamics f o g (sympy expressions or Polynomials)
+            dir_mat: matrix whose rows are direction vectors
+            bund: Bundle object
+    @returns array of upper bounds, array of lower bounds
+    """
+    @classmethod
+    def getDirBounds(cls, fog, dir_mat, bund):
+        bounds = [ cls(dir_poly(dir_vec, fog), bund).getBounds() for dir_vec in dir_mat ]
+        ub, lb = zip(*bounds)
+
+        return np.asarray(ub, dtype=float), np.asarray(lb, dtype=float)
+
+"""
+Returns the linear combination dir_vec * fog of the composed dynamics.
+"""
+def dir_poly(dir_vec, fog):
+    if isinstance(fog[0], Polynomial):
+        return Polynomial.lin_comb(dir_vec, fog)
+
+    dir_expr = 0
+    for coeff_idx, coeff in enumerate(dir_vec):
+        dir_expr += coeff * fog[coeff_idx]
+
+    return dir_expr
@@ -0,0 +1,150 @@
+import multiprocessing as mp
+import numpy as np
+import random
+
+from kaa.settings import KaaSettings
+from kaa.timer import Timer
+
+"""
+State held by each worker process of a TransformPool: the compiled model and the optimization procedure.
+"""
+_worker_state = {}
+
+def _init_worker(model, opt_prod):
+    _worker_state['model'] = model
+    _worker_state['opt_prod'] = opt_prod
+
+"""
+Worker routine bounding every direction in dir_mat over the parallelotope with generator map q + G*a.
+Only called by Pool.starmap
+@params base_vertex: base vertex q
+        gen_mat: generator matrix G
+        dir_mat: matrix whose rows are the direction vectors
+@returns array of upper bounds, array of lower bounds, refinement report of the optimization procedure
+"""
+def _bound_worker(base_vertex, gen_mat, dir_mat):
+    model = _worker_state['model']
+    opt_prod = _worker_state['opt_prod']
+
+    fog = model.f_poly.compose_affine(base_vertex, gen_mat)
+    with opt_prod.step_scope():
+        ub, lb = opt_prod.getDirBounds(fog, dir_mat, model.bund)
+
+    return ub, -1 * lb, opt_prod.step_report()
+
+"""
+Persistent pool of worker processes for the bundle transformation. Each worker receives the compiled
+model once at startup; afterwards only the generators of a parallelotope and its directions are sent over.
+"""
+class TransformPool:
+
+    """
+    @params model: Model with compiled polynomial dynamics
+            opt_prod: OptimizationProd class accepting compiled polynomials
+            num_workers: number of processes, defaults to the number of cores.
+    """
+    def __init__(self, model, opt_prod, num_workers=None):
+        assert model.f_poly is not None, "Parallel transformation requires compiled polynomial dynamics."
+
+        self.num_workers = num_workers if num_workers is not None else mp.cpu_count()
+        self.pool = mp.Pool(processes=self.num_workers, initializer=_init_worker, initargs=(model, opt_prod))
+
+    """
+    Dispatches the bound computation of each parallelotope to the workers.
+    @params gen_list: list of (base vertex, generator matrix) tuples, one per parallelotope
+            dir_mat_list: list of direction matrices, one per parallelotope
+    @returns list of (upper bounds, lower bounds) tuples in the order of the input, summed refinement reports or None
+    """
+    def find_bounds(self, gen_list, dir_mat_list):
+        tasks = [ (base_vertex, gen_mat, dir_mat) for (base_vertex, gen_mat), dir_mat in zip(gen_list, dir_mat_list) ]
+        chunk_size = max(1, len(tasks) // (4 * self.num_workers))
+
+        results = self.pool.starmap(_bound_worker, tasks, chunksize=chunk_size)
+        reports = [ report for _, _, report in results if report is not None ]
+
+        return [ (ub, lb) for ub, lb, _ in results ], merge_reports(reports)
+
+    """
+    Shuts down the worker processes.
+    """
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+"""
+Sums refinement reports count by count.
+@params reports: list of dictionaries of counts
+@returns merged dictionary or None if reports is empty.
+"""
+def merge_reports(reports):
+    if not reports:
+        return None
+
+    merged = {}
+    for report in reports:
+        for key, count in report.items():
+            merged[key] = merged.get(key, 0) + count
+
+    return merged
+
+"""
+Runs one reachable set computation of an experiment. The Python and NumPy generators are seeded with the job's
+seed first so the result does not depend on which process runs the job or in what order.
+@params model: Model
+        strat: TempStrategy or None for the default strategy
+        num_steps: number of time steps
+        seed: RNG seed of the job
+        vol_method: volume metric to precompute on the flowpipe, or None
+        own_timer: clear the Timer before the job and return its table, used in worker processes
+@returns FlowPipe object, Timer table of the job or None
+"""
+def _reach_job(model, strat, num_steps, seed, vol_method, own_timer):
+    from kaa.reach import ReachSet
+
+    random.seed(seed)
+    np.random.seed(seed)
+
+    if own_timer:
+        Timer.time_table = {}
+
+    flowpipe = ReachSet(model).computeReachSet(num_steps, tempstrat=strat)
+    if vol_method is not None:
+        flowpipe.get_volume_data(vol_method)
+
+    return flowpipe, Timer.time_table if own_timer else None
+
+def _init_job_worker():
+    'Daemonic workers cannot start the transformation pool of their own.'
+    KaaSettings.use_parallel = False
+
+"""
+Computes the flowpipes of independent (model, strategy, steps) jobs, optionally across a pool of processes.
+Job i is seeded with the i-th seed spawned from KaaSettings.ExperimentSeed in both modes, so serial and
+parallel runs produce the same flowpipes. The Timer tables of the workers are merged into the parent.
+@params jobs: list of (model, strat, num_steps) tuples
+        parallel: run the jobs in a process pool
+        num_workers: number of processes, defaults to KaaSettings.NumWorkers or the number of cores
+        vol_method: volume metric to precompute on each flowpipe, or None
+@returns list of FlowPipe objects in the order of the jobs.
+"""
+def run_reach_jobs(jobs, parallel=False, num_workers=None, vol_method=None):
+    seeds = [ int(seq.generate_state(1)[0]) for seq in np.random.SeedSequence(KaaSettings.ExperimentSeed).spawn(len(jobs)) ]
+    job_args = [ (model, strat, num_steps, seed, vol_method, parallel) for (model, strat, num_steps), seed in zip(jobs, seeds) ]
+
+    if not parallel:
+        return [ _reach_job(*args)[0] for args in job_args ]
+
+    num_workers = num_workers if num_workers is not None else (KaaSettings.NumWorkers or mp.cpu_count())
+    with mp.Pool(processes=min(num_workers, len(jobs)), initializer=_init_job_worker) as pool:
+        results = pool.starmap(_reach_job, job_args, chunksize=1)
+
+    for _, time_table in results:
+        Timer.merge(time_table)
+
+    return [ flowpipe for flowpipe, _ in results ]
@@ -1,11 +1,13 @@
 import numpy as np
-import multiprocessing as mp
 import random
+from itertools import product
 
 from kaa.linearsystem import LinearSystem
 from kaa.lputil import minLinProg, maxLinProg
 from kaa.timer import Timer
-from kaa.settings import KaaSettings
+
+'Highest dimension for which the vertices of a parallelotope are enumerated.'
+MAX_VERTEX_DIM = 10
 
 """
 Object encapsulating routines calculating properties of parallelotopes.
@@ -16,94 +18,56 @@ class Parallelotope(LinearSystem):
         super().__init__(model, A, b)
         self.u_A = A[:self.dim]
         self.u_b = b[:self.dim]
+        self._generators = None
+        self._vertices = None
 
     """
     Return list of functions transforming the n-unit-box over the parallelotope.
     @returns list of transfomation from unitbox over the parallelotope.
     """
     def getGeneratorRep(self):
+        return generator_rep(*self.getGenerators(), self.vars)
 
-        Timer.start('Generator Procedure')
-        base_vertex = self._computeBaseVertex()
-        gen_list = self._computeGenerators(base_vertex)
-
-        'Create list representing the linear transformation q + \sum_{j} a_j* g_j'
-        expr_list = base_vertex
-        for j in range(self.dim):
-            for var_ind, var in enumerate(self.vars):
-                expr_list[j] += gen_list[var_ind][j] * var
-        Timer.stop('Generator Procedure')
-
-        return expr_list
-    
     """
-    Calculate generators as substraction: vertices - base_vertex.
-    We calculate the vertices by solving the following linear system for each vertex i:
-
-
-    Ax = [b_1, ... , -b_{i+n}, ... , b_n]^T
-
-    Note that this simply finds the vertex to calculate the generator vectors. The generators will be the vectors g_j = v_j - q
-    where v_j is the jth vertex calculated in the manner above.
-
-    The parallelotope will be exprssed as sum of the base vertex and the convex combination of the generators.
+    Return the numeric generator representation of the parallelotope i.e the base vertex q
+    and the matrix G whose columns are the generators g_j.
 
-    p(a_1, ... ,a_n) =  q + \sum_{j} a_j * g_j
+    p(a_1, ... ,a_n) = q + G * [a_1, ... , a_n]^T
 
-    where q is the base vertex and the g_j are the generators. a_j will be in the unitbox [0,1]
-
-    @params base_vertex: base vertex q
-    @returns generator vectors g_j
+    @returns base vertex q, generator matrix G
     """
-    def _computeGenerators(self, base_vertex):
-        
-        'Hacky way to toggle parallelism for experiments'
-        if KaaSettings.use_parallel:
-            p = mp.Pool(processes=4)
-            vertices = p.starmap(self._gen_worker, [ (i, u_b, coeff_mat) for i in range(self.dim) ])
-            p.close()
-            p.join()
-        else:
-            vertices = []
-            for i in range(self.dim):
-               vertices.append(self._gen_worker(i, self.u_b, self.u_A))
-
-        vertex_list = [ [vert - base for vert, base in zip(vertices[i], base_vertex)] for i in range(self.dim) ]
-        #print("Vertex List For Paratope: {} \n".format(vertices))
-        #print("Vector List For Paratope: {} \n".format(vertex_list))
-        return vertex_list
+    def getGenerators(self):
+        if self._generators is None:
+            Timer.start('Generator Procedure')
+            self._generators = compute_generators(self.u_A, self.u_b, self.b[self.dim:])
+            Timer.stop('Generator Procedure')
+
+        return self._generators
 
     """
-    Worker process for calculating vertices of higher-dimensional parallelotopes.
-    Only called by Pool.starmap
-    @params i - vertex index
-            u_b, coef_mat - shared reference to upper offsets and directions matrix.
-    @returns coordinates of vertex
+    Exact volume of the parallelotope. As the affine image of the unit box under q + G * a, its volume is |det G|.
     """
-    def _gen_worker(self, i, u_b, coeff_mat):
-        #print(coeff_mat, u_b)
-
-        negated_bi = np.copy(self.u_b)
-        negated_bi[i] = -self.b[i + self.dim]
-        #print("(coeff_mat, negated_bi): {}".format((coeff_mat, negated_bi)))
-        sol_set_i = np.linalg.solve(coeff_mat, negated_bi)
-
-        return list(sol_set_i)
+    @property
+    def volume(self):
+        _, gen_mat = self.getGenerators()
+        return abs(np.linalg.det(gen_mat))
 
     """
-    Calculate the base vertex of the parallelotope (variable q)
-    We calculate the vertices by solving a linear system of the following form:
-
-    Ax = u_b
-
-    where u_b are the offsets for the upper facets of parallelotope (first half of self.b).
-
-    @returns base-vertex in list
+    Vertices of the parallelotope q + G * v for every corner v of the unit box.
+    Enumerating the 2^n corners is only done up to MAX_VERTEX_DIM dimensions.
+    @returns matrix whose rows are the vertices, or None in higher dimensions.
     """
-    def _computeBaseVertex(self):
-        sol_set = np.linalg.solve(self.u_A, self.u_b)
-        return list(sol_set)
+    @property
+    def vertices(self):
+        if self.dim > MAX_VERTEX_DIM:
+            return None
+
+        if self._vertices is None:
+            base_vertex, gen_mat = self.getGenerators()
+            corners = np.array(list(product((0, 1), repeat=self.dim)))
+            self._vertices = base_vertex + corners @ gen_mat.T
 
+        return self._vertices
 
     """
     Convert numpy matrix into sympy matrix
@@ -121,3 +85,37 @@ class Parallelotope(LinearSystem):
     def _convertSolSetToList(self, fin_set):
         assert fin_set is not sp.EmptySet
         return list(fin_set.args[0])
+
+"""
+Computes the generator representation of one or many parallelotopes from a single inversion of their direction matrices.
+The base vertex q solves u_A q = u_b. The j-th vertex v_j solves the same system with the j-th upper offset
+replaced by the negated lower offset, so
+
+q = u_A^{-1} u_b,    g_j = v_j - q = -(u_b_j + l_b_j) * u_A^{-1} e_j.
+
+@params dir_mats: (dim x dim) direction matrix u_A or a stack of them
+        offu: upper offsets u_b, stacked alike
+        offl: lower offsets l_b, stacked alike
+@returns base vertices, generator matrices whose columns are the generators
+"""
+def compute_generators(dir_mats, offu, offl):
+    dir_inv = np.linalg.inv(dir_mats)
+    base_vertices = np.einsum('...ij,...j->...i', dir_inv, offu)
+    gen_mats = dir_inv * -(offu + offl)[..., None, :]
+
+    return base_vertices, gen_mats
+
+"""
+Builds the sympy generator map q + sum_j a_j * g_j over the unit-box variables.
+@params base_vertex: base vertex q
+        gen_mat: generator matrix G
+        vars: sympy variables a_j
+@returns list of sympy expressions, one per coordinate.
+"""
+def generator_rep(base_vertex, gen_mat, vars):
+    expr_list = list(base_vertex)
+    for j in range(len(expr_list)):
+        for var_ind, var in enumerate(vars):
+            expr_list[j] += gen_mat[j][var_ind] * var
+
+    return expr_list
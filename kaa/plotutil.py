@@ -207,7 +207,7 @@ class Plot:
         for bund in flowpipe:
             bund_sys = bund.getIntersect()
 
-            supp_points = np.asarray([bund_sys.max_opt(vec).x  for vec in norm_vecs])
+            _, supp_points = bund_sys.support(norm_vecs)
             x_points = supp_points[:,x]
             y_points = supp_points[:,y]
 
@@ -0,0 +1,266 @@
+import numpy as np
+import sympy as sp
+
+"""
+Numeric sparse polynomial. Each row of the exponent matrix exps describes one monomial
+and the matching entry of coeffs holds its floating-point coefficient i.e
+
+p(x) = sum_k coeffs[k] * prod_i x_i^{exps[k][i]}
+
+Variables are positional; the polynomial carries no sympy symbols.
+"""
+class Polynomial:
+
+    def __init__(self, exps, coeffs, num_vars=None):
+        coeffs = np.asarray(coeffs, dtype=float).reshape(-1)
+        num_vars = np.shape(exps)[-1] if num_vars is None else num_vars
+
+        self.exps = np.asarray(exps, dtype=int).reshape(len(coeffs), num_vars)
+        self.coeffs = coeffs
+        self.num_vars = num_vars
+        self._coeff_dict = None
+
+    """
+    Converts a sympy expression into a Polynomial over the input variables.
+    Raises sp.PolynomialError if the expression is not polynomial in vars.
+    @params expr: sympy expression
+            vars: list of sympy symbols in their positional order.
+    @returns Polynomial object
+    """
+    @staticmethod
+    def from_sympy(expr, vars):
+        expr = sp.sympify(expr)
+
+        if not expr.free_symbols <= set(vars):
+            raise sp.PolynomialError(f"{expr} contains symbols outside of {vars}")
+
+        terms = sp.Poly(expr, *vars).terms()
+        exps = [monom for monom, _ in terms]
+        coeffs = [float(coeff) for _, coeff in terms]
+
+        return Polynomial(exps, coeffs, len(vars))._reduce()
+
+    """
+    Returns the constant polynomial c in num_vars variables.
+    """
+    @staticmethod
+    def constant(c, num_vars):
+        return Polynomial(np.zeros((1, num_vars), dtype=int), [c], num_vars)._reduce()
+
+    """
+    Returns the affine polynomial c + sum_j coeffs[j] * x_j. Zero coefficients are dropped
+    to preserve sparsity.
+    @params c: constant term
+            lin_coeffs: coefficients of the linear terms.
+    """
+    @staticmethod
+    def affine(c, lin_coeffs):
+        lin_coeffs = np.asarray(lin_coeffs, dtype=float)
+        num_vars = len(lin_coeffs)
+
+        exps = np.vstack((np.zeros(num_vars, dtype=int), np.eye(num_vars, dtype=int)))
+        coeffs = np.concatenate(([c], lin_coeffs))
+
+        return Polynomial(exps, coeffs, num_vars)._reduce()
+
+    """
+    Returns the linear combination sum_k weights[k] * polys[k].
+    @params weights: list of scalar weights
+            polys: list of Polynomial objects over the same variables.
+    """
+    @staticmethod
+    def lin_comb(weights, polys):
+        assert len(weights) == len(polys), "Each polynomial must be assigned a weight."
+
+        exps = np.vstack([poly.exps for poly in polys])
+        coeffs = np.concatenate([w * poly.coeffs for w, poly in zip(weights, polys)])
+
+        return Polynomial(exps, coeffs, polys[0].num_vars)._reduce()
+
+    """
+    Maximum exponent of each variable.
+    """
+    @property
+    def degree(self):
+        return self.exps.max(axis=0) if len(self.coeffs) else np.zeros(self.num_vars, dtype=int)
+
+    """
+    Returns the coefficient of the monomial with input exponents.
+    @params monom: tuple of exponents
+    """
+    def coeff(self, monom):
+        if self._coeff_dict is None:
+            self._coeff_dict = { tuple(exp): coeff for exp, coeff in zip(self.exps.tolist(), self.coeffs) }
+
+        return self._coeff_dict.get(tuple(monom), 0.0)
+
+    """
+    Returns the dense coefficient tensor of the polynomial. Entry [j_1, ..., j_n] holds the
+    coefficient of the monomial x_1^{j_1} ... x_n^{j_n}.
+    @params degree: optional per-variable degrees bounding the tensor, defaults to self.degree
+    @returns ndarray of shape (d_1+1, ..., d_n+1)
+    """
+    def to_dense(self, degree=None):
+        degree = self.degree if degree is None else degree
+
+        tensor = np.zeros(tuple(d + 1 for d in degree))
+        tensor[tuple(self.exps.T)] = self.coeffs
+
+        return tensor
+
+    """
+    Evaluates the polynomial on a batch of points.
+    @params points: (N x num_vars) array
+    @returns array of N values
+    """
+    def eval(self, points):
+        points = np.atleast_2d(points)
+        monoms = np.prod(points[:, None, :] ** self.exps[None, :, :], axis=2)
+        return monoms @ self.coeffs
+
+    """
+    Converts back into a sympy expression.
+    @params vars: list of sympy symbols in their positional order.
+    """
+    def to_sympy(self, vars):
+        assert len(vars) == self.num_vars, "Number of variables must match the polynomial."
+
+        terms = []
+        for exp, coeff in zip(self.exps, self.coeffs):
+            monom = [var**int(e) for var, e in zip(vars, exp) if e]
+            terms.append(sp.Mul(sp.Float(coeff), *monom))
+
+        return sp.Add(*terms)
+
+    """
+    Merges like monomials and drops zero coefficients.
+    """
+    def _reduce(self):
+        if len(self.coeffs) == 0:
+            return self
+
+        'Pack each exponent row into one integer key when it fits; row-wise unique is far slower.'
+        radix = self.exps.max(axis=0) + 1
+        if np.prod(radix, dtype=float) < 2**62:
+            place = np.concatenate((np.cumprod(radix[::-1])[-2::-1], [1])).astype(np.int64)
+            _, first, inv = np.unique(self.exps @ place, return_index=True, return_inverse=True)
+            uniq_exps = self.exps[first]
+        else:
+            uniq_exps, inv = np.unique(self.exps, axis=0, return_inverse=True)
+
+        coeffs = np.bincount(inv.reshape(-1), weights=self.coeffs, minlength=len(uniq_exps))
+
+        nonzero = coeffs != 0
+        return Polynomial(uniq_exps[nonzero], coeffs[nonzero], self.num_vars)
+
+    def __add__(self, other):
+        if not isinstance(other, Polynomial):
+            other = Polynomial.constant(other, self.num_vars)
+
+        return Polynomial.lin_comb([1, 1], [self, other])
+
+    __radd__ = __add__
+
+    def __mul__(self, other):
+        if not isinstance(other, Polynomial):
+            return Polynomial(self.exps, other * self.coeffs, self.num_vars)._reduce()
+
+        assert self.num_vars == other.num_vars, "Polynomials must be defined over the same variables."
+
+        exps = (self.exps[:, None, :] + other.exps[None, :, :]).reshape(-1, self.num_vars)
+        coeffs = np.outer(self.coeffs, other.coeffs).reshape(-1)
+
+        return Polynomial(exps, coeffs, self.num_vars)._reduce()
+
+    __rmul__ = __mul__
+
+    def __pow__(self, k):
+        assert int(k) == k and k >= 0, "Only non-negative integer powers are supported."
+
+        result = Polynomial.constant(1, self.num_vars)
+        for _ in range(int(k)):
+            result = result * self
+
+        return result
+
+    def __len__(self):
+        return len(self.coeffs)
+
+    def __str__(self):
+        return "Polynomial({} terms over {} variables)".format(len(self), self.num_vars)
+
+"""
+Vector-valued polynomial map such as the dynamics of a Model. Monomials shared between the
+components are expanded once during composition.
+"""
+class PolyMap:
+
+    def __init__(self, polys):
+        assert len(polys) != 0, "PolyMap must contain at least one polynomial."
+
+        self.polys = polys
+        self.num_vars = polys[0].num_vars
+
+    """
+    Compiles a list of sympy expressions into a PolyMap.
+    Raises sp.PolynomialError if any expression is not polynomial in vars.
+    @params funcs: list of sympy expressions
+            vars: list of sympy symbols in their positional order.
+    """
+    @staticmethod
+    def from_sympy(funcs, vars):
+        return PolyMap([Polynomial.from_sympy(func, vars) for func in funcs])
+
+    """
+    Composes the map with the affine map x = q + G*a where the columns of G are the generators of a parallelotope.
+    @params base_vertex: vector q
+            gen_mat: matrix G
+    @returns list of Polynomials in the unit-box variables a.
+    """
+    def compose_affine(self, base_vertex, gen_mat):
+        inner = [ Polynomial.affine(q, gen_row) for q, gen_row in zip(base_vertex, gen_mat) ]
+        return self.compose(inner)
+
+    """
+    Substitutes the i-th variable of every component with inner[i].
+    @params inner: list of Polynomials, one for each variable of the map.
+    @returns list of composed Polynomials.
+    """
+    def compose(self, inner):
+        assert len(inner) == self.num_vars, "Must substitute every variable of the map."
+
+        out_vars = inner[0].num_vars
+        monom_cache = { (0,) * self.num_vars: Polynomial.constant(1, out_vars) }
+
+        'Expand each monomial by peeling off its last variable, reusing shared lower monomials.'
+        def expand(monom):
+            if monom not in monom_cache:
+                var_ind = max(i for i, e in enumerate(monom) if e)
+                lower = monom[:var_ind] + (monom[var_ind] - 1,) + monom[var_ind+1:]
+                monom_cache[monom] = expand(lower) * inner[var_ind]
+
+            return monom_cache[monom]
+
+        composed = []
+        for poly in self.polys:
+            terms = [ expand(tuple(exp)) for exp in poly.exps.tolist() ]
+            composed.append(Polynomial.lin_comb(poly.coeffs, terms) if terms else Polynomial.constant(0, out_vars))
+
+        return composed
+
+    """
+    Evaluates the map on a batch of points.
+    @params points: (N x num_vars) array
+    @returns (N x len(self)) array of images.
+    """
+    def eval(self, points):
+        return np.column_stack([poly.eval(points) for poly in self.polys])
+
+    def __getitem__(self, index):
+        return self.polys[index]
+
+    def __iter__(self):
+        return iter(self.polys)
+
+    def __len__(self):
+        return len(self.polys)
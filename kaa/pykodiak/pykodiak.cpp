@@ -3,6 +3,8 @@
 #include <exception>
 #include <map>
 #include <vector>
+#include <thread>
+#include <algorithm>
 
 #include <kodiak.hpp>
 
@@ -16,6 +18,9 @@ static int precision = -6;
 static vector<Real> reals;
 static map<string, int> varToRealIndex;
 
+// sizes of the reals vector at the start of each open arena
+static vector<size_t> arenaMarks;
+
 extern "C"
 {
     // call once at initialization time
@@ -57,6 +62,36 @@ extern "C"
         return 1;
     }
 
+    // open an arena; every expression created until the matching popArena() is released by it.
+    // returns the number of open arenas
+    int pushArena()
+    {
+        arenaMarks.push_back(reals.size());
+
+        return arenaMarks.size();
+    }
+
+    // release every expression created since the matching pushArena(). Variables are created before any
+    // arena is opened, so they persist. returns the number of expressions left
+    int popArena()
+    {
+        if (arenaMarks.empty())
+            throw runtime_error("popArena() called without a matching pushArena()");
+
+        size_t mark = arenaMarks.back();
+        arenaMarks.pop_back();
+
+        reals.erase(reals.begin() + mark, reals.end());
+
+        return reals.size();
+    }
+
+    // number of live expressions, including variables
+    int numExpressions()
+    {
+        return reals.size();
+    }
+
     // lookup a variable expression index by name (should have been prevoisly inserted with addVariable)
     int lookupVariable(const char* name)
     {
@@ -179,6 +214,39 @@ extern "C"
         return reals.size() - 1;
     }
 
+    // make a new expression for the polynomial sum_k coeffs[k] * prod_i reals[varIndices[i]]^exps[k * numVars + i]
+    // in a single call. exps is a row-major numTerms x numVars matrix of non-negative integer exponents.
+    int makePoly(int numTerms, int numVars, const int* varIndices, const int* exps, const double* coeffs)
+    {
+        for (int i = 0; i < numVars; ++i)
+            checkIndex(__func__, varIndices[i]);
+
+        Real poly = val(approx(0.0));
+        bool empty = true;
+
+        for (int k = 0; k < numTerms; ++k)
+        {
+            Real term = val(approx(coeffs[k]));
+
+            for (int i = 0; i < numVars; ++i)
+            {
+                int e = exps[k * numVars + i];
+
+                if (e == 1)
+                    term = term * reals[varIndices[i]];
+                else if (e > 1)
+                    term = term * (reals[varIndices[i]]^e);
+            }
+
+            poly = empty ? term : poly + term;
+            empty = false;
+        }
+
+        reals.push_back(poly);
+
+        return reals.size() - 1;
+    }
+
     // [ctypes.c_int, # nonlinear expression
     // ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"), ctypes.c_int,
     // ctypes.c_int, # bias
@@ -252,4 +320,80 @@ extern "C"
         rv[2] = answer.ub_of_min();
         rv[3] = answer.lb_of_max();
     }
+
+    // bound a single expression over the box given by bounds (numVars x 2, row-major)
+    static void minmaxOne(int exp, const double* bounds, double* rv)
+    {
+        MinMaxSystem sys;
+
+        sys.setDefaultEnclosureMethodTrueForBernsteinAndFalseForIntervalArithmetic(bernstein);
+        sys.set_precision(precision);
+
+        for (auto it = varToRealIndex.begin(); it != varToRealIndex.end(); ++it)
+        {
+            int row = it->second;
+            sys.var(it->first.c_str(), approx(bounds[row * 2]), approx(bounds[row * 2 + 1]));
+        }
+
+        sys.minmax(reals[exp]);
+
+        MinMax answer = sys.answer();
+        rv[0] = answer.lb_of_min();
+        rv[1] = answer.ub_of_max();
+    }
+
+    // bound every expression in exps over the same box in one call. rv receives numExps rows of (lb, ub).
+    // with numThreads > 1 the expressions are split into contiguous chunks solved by separate threads
+    void minmaxBatch(const int* exps, int numExps, double* bounds, int boundsRows, int boundsCols,
+                     int numThreads, double* rv, int rvSize)
+    {
+        int numVars = (int)varToRealIndex.size();
+
+        if (boundsRows != numVars || boundsCols != 2)
+        {
+            char msg[256];
+            snprintf(msg, sizeof(msg), "minmaxBatch() called with %dx%d bounds (expected %dx2)",
+                     boundsRows, boundsCols, numVars);
+
+            throw runtime_error(msg);
+        }
+
+        if (rvSize != 2 * numExps)
+        {
+            char msg[256];
+            snprintf(msg, sizeof(msg), "minmaxBatch() called with rv array of size %d (expected %d)",
+                     rvSize, 2 * numExps);
+
+            throw runtime_error(msg);
+        }
+
+        for (int i = 0; i < numExps; ++i)
+            checkIndex(__func__, exps[i]);
+
+        numThreads = max(1, min(numThreads, numExps));
+
+        if (numThreads == 1)
+        {
+            for (int i = 0; i < numExps; ++i)
+                minmaxOne(exps[i], bounds, rv + 2 * i);
+
+            return;
+        }
+
+        vector<thread> workers;
+        int chunk = (numExps + numThreads - 1) / numThreads;
+
+        for (int start = 0; start < numExps; start += chunk)
+        {
+            int end = min(numExps, start + chunk);
+
+            workers.emplace_back([=]() {
+                for (int i = start; i < end; ++i)
+                    minmaxOne(exps[i], bounds, rv + 2 * i);
+            });
+        }
+
+        for (auto& worker : workers)
+            worker.join();
+    }
 }
@@ -7,11 +7,12 @@ Oct 2018
 
 import ctypes
 import os
+from contextlib import contextmanager
 
 import numpy as np
 from numpy.ctypeslib import ndpointer
 
-from sympy import Mul, Expr, Add, Pow, Symbol, Number, sin, cos, atan
+from sympy import Mul, Expr, Add, Pow, Symbol, Number, Poly, sin, cos, atan
 from sympy.parsing.sympy_parser import parse_expr
 
 def get_script_path(filename):
@@ -25,6 +26,10 @@ class Kodiak:
 
     variables = {} # dict of added variables for error checking
 
+    # structural caches from sympy expressions and polynomial keys to expression indices, one per open arena.
+    # the bottom cache belongs to expressions created outside of any arena
+    memo_stack = [{}]
+
     @classmethod
     def init(cls):
         'initialize the static members'
@@ -95,6 +100,37 @@ class Kodiak:
             cls._make_atan.restype = ctypes.c_int
             cls._make_atan.argtypes = [ctypes.c_int]
 
+            # n-ary polynomial builder, missing from libraries built before it was added
+            cls._make_poly = getattr(cls.lib, 'makePoly', None)
+
+            if cls._make_poly is not None:
+                cls._make_poly.restype = ctypes.c_int
+                cls._make_poly.argtypes = [ctypes.c_int, ctypes.c_int,
+                                           ndpointer(ctypes.c_int32, flags="C_CONTIGUOUS"),
+                                           ndpointer(ctypes.c_int32, flags="C_CONTIGUOUS"),
+                                           ndpointer(ctypes.c_double, flags="C_CONTIGUOUS")]
+
+            # batched minmax, missing from libraries built before it was added
+            cls._minmax_batch = getattr(cls.lib, 'minmaxBatch', None)
+
+            if cls._minmax_batch is not None:
+                cls._minmax_batch.restype = None
+                cls._minmax_batch.argtypes = [ndpointer(ctypes.c_int32, flags="C_CONTIGUOUS"), ctypes.c_int,
+                                              ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"), ctypes.c_int,
+                                              ctypes.c_int,
+                                              ctypes.c_int, # number of threads
+                                              ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"), ctypes.c_int]
+
+            # arenas, missing from libraries built before they were added
+            cls._push_arena = getattr(cls.lib, 'pushArena', None)
+            cls._pop_arena = getattr(cls.lib, 'popArena', None)
+            cls._num_expressions = getattr(cls.lib, 'numExpressions', None)
+
+            for func in [cls._push_arena, cls._pop_arena, cls._num_expressions]:
+                if func is not None:
+                    func.restype = ctypes.c_int
+                    func.argtypes = []
+
             cls._minmax_diff = cls.lib.minmax_diff
             cls._minmax_diff.restype = None
             cls._minmax_diff.argtypes = [ctypes.c_int, # nonlinear expression
@@ -147,6 +183,84 @@ class Kodiak:
         #return rv[0], rv[1]
         return rv[0], rv[1], rv[2], rv[3]
 
+    @classmethod
+    def minmax_batch(cls, exp_indices, bounds, num_threads=1):
+        '''return arrays of the lower and upper bounds of every passed-in expression within the passed-in bounds,
+        computed in a single call. num_threads > 1 splits the expressions across native threads'''
+
+        cls.init()
+
+        exp_indices = np.ascontiguousarray(exp_indices, dtype=np.int32).reshape(-1)
+        bounds = np.ascontiguousarray(bounds, dtype=float)
+
+        if cls._minmax_batch is None:
+            zero_approx = np.zeros(len(bounds))
+            rv = np.array([cls.minmax_diff(i, zero_approx, 0, bounds)[:2] for i in exp_indices], dtype=float)
+            return rv[:, 0], rv[:, 1]
+
+        rv = np.zeros(2 * len(exp_indices), dtype=float)
+        cls._minmax_batch(exp_indices, len(exp_indices), bounds, bounds.shape[0], bounds.shape[1],
+                          num_threads, rv, rv.shape[0])
+
+        return rv[0::2], rv[1::2]
+
+    @classmethod
+    def push_arena(cls):
+        '''open an arena. Expressions created until the matching pop_arena() are released together by it.
+        Variables must be added before the first arena is opened; they persist across arenas.'''
+
+        cls.init()
+
+        if cls._push_arena is not None:
+            cls._push_arena()
+
+        cls.memo_stack.append({})
+
+    @classmethod
+    def pop_arena(cls):
+        '''release every expression created since the matching push_arena(), along with their cache entries.
+        Expression indices from inside the arena must not be used afterwards.
+        Without native arena support only the cache entries are released.'''
+
+        cls.init()
+
+        assert len(cls.memo_stack) > 1, "pop_arena() called without a matching push_arena()"
+        cls.memo_stack.pop()
+
+        if cls._pop_arena is not None:
+            cls._pop_arena()
+
+    @classmethod
+    @contextmanager
+    def arena(cls):
+        '''context manager opening an arena for the duration of the block'''
+
+        cls.push_arena()
+
+        try:
+            yield
+        finally:
+            cls.pop_arena()
+
+    @classmethod
+    def num_expressions(cls):
+        'number of live expressions, or None if the library does not report it'
+
+        cls.init()
+        return cls._num_expressions() if cls._num_expressions is not None else None
+
+    @classmethod
+    def _memo_get(cls, key):
+        'look up an expression index in the caches of every open arena, innermost first'
+
+        for memo in reversed(cls.memo_stack):
+            rv = memo.get(key)
+
+            if rv is not None:
+                return rv
+
+        return None
+
     @classmethod
     def use_bernstein(cls, use_bernstein):
         'should we use bernstein polynomials for optimization (false = interval arithmetic), default: True'
@@ -254,23 +368,109 @@ class Kodiak:
         cls.init()
         return cls._make_atan(a)
 
+    @classmethod
+    def make_poly(cls, var_indices, exps, coeffs):
+        '''make and return an expression index for the polynomial sum_k coeffs[k] * prod_i var_indices[i]^exps[k][i]
+
+        var_indices are expression indices (usually variables), exps is a (num terms x num vars) matrix of
+        non-negative integer exponents. The polynomial is built with a single foreign call when the library
+        provides makePoly. Identical polynomials return the cached index.
+        '''
+
+        cls.init()
+
+        coeffs = np.ascontiguousarray(coeffs, dtype=float).reshape(-1)
+        var_indices = np.ascontiguousarray(var_indices, dtype=np.int32).reshape(-1)
+        exps = np.ascontiguousarray(exps, dtype=np.int32).reshape(len(coeffs), len(var_indices))
+
+        key = ('poly', var_indices.tobytes(), exps.tobytes(), coeffs.tobytes())
+        rv = cls._memo_get(key)
+
+        if rv is None:
+            if cls._make_poly is not None:
+                rv = cls._make_poly(len(coeffs), len(var_indices), var_indices, exps, coeffs)
+            else:
+                rv = cls._make_poly_binary(var_indices, exps, coeffs)
+
+            cls.memo_stack[-1][key] = rv
+
+        return rv
+
+    @classmethod
+    def _make_poly_binary(cls, var_indices, exps, coeffs):
+        'fallback for make_poly() built from binary operations, sharing the monomials between terms'
+
+        if len(coeffs) == 0:
+            return cls.make_double(0.0)
+
+        monoms = {}
+        rv = None
+
+        for exp, coeff in zip(exps.tolist(), coeffs.tolist()):
+            monom = tuple(exp)
+
+            if monom not in monoms:
+                factors = [var if e == 1 else cls.make_intpow(var, e) for var, e in zip(var_indices.tolist(), exp) if e]
+                monoms[monom] = None
+
+                for factor in factors:
+                    monoms[monom] = factor if monoms[monom] is None else cls.make_mult(monoms[monom], factor)
+
+            term = cls.make_double(coeff)
+            if monoms[monom] is not None:
+                term = cls.make_mult(term, monoms[monom])
+
+            rv = term if rv is None else cls.make_add(rv, term)
+
+        return rv
+
+    @classmethod
+    def poly_to_kodiak(cls, poly, var_names):
+        '''convert a kaa.polynomial.Polynomial over the named variables (in positional order) to a Kodiak expression'''
+
+        var_indices = [cls.lookup_variable(name) for name in var_names]
+        return cls.make_poly(var_indices, poly.exps, poly.coeffs)
+
     @classmethod
     def sympy_to_kodiak(cls, sympy_exp):
         '''convert a sympy expression to Kodiak expression
 
         this function actually returns an int, which is the expression index in the c++ 'reals' vector that
-        represents the (newly-constructed) expression
+        represents the expression. Structurally identical subexpressions are converted only once, and
+        polynomial subexpressions are converted with a single make_poly() call.
         '''
 
         cls.init()
 
-        rv = None
         e = sympy_exp
 
         if not isinstance(e, Expr):
             raise RuntimeError("Expected sympy Expr: " + repr(e))
 
-        if isinstance(e, Symbol):
+        rv = cls._memo_get(e)
+
+        if rv is None:
+            rv = cls._convert_sympy(e)
+            cls.memo_stack[-1][e] = rv
+
+        return rv
+
+    @classmethod
+    def _convert_sympy(cls, e):
+        'convert a single sympy node, recursing into its arguments through sympy_to_kodiak()'
+
+        rv = None
+
+        if isinstance(e, (Add, Mul)) and cls._is_kodiak_poly(e):
+            syms = sorted(e.free_symbols, key=lambda sym: cls.variables[sym.name])
+            terms = Poly(e, *syms).terms()
+
+            var_indices = [cls.lookup_variable(sym.name) for sym in syms]
+            exps = [monom for monom, _ in terms]
+            coeffs = [float(coeff) for _, coeff in terms]
+
+            rv = cls.make_poly(var_indices, exps, coeffs)
+        elif isinstance(e, Symbol):
             rv = cls.lookup_variable(e.name)
 
             if rv is None:
@@ -323,3 +523,10 @@ class Kodiak:
         assert rv is not None, f"conversion of '{e}' to a Kodiak expression unsupported (type {type(e)})"
 
         return rv
+
+    @classmethod
+    def _is_kodiak_poly(cls, e):
+        'is the expression a polynomial with numeric coefficients in variables added with add_variable()?'
+
+        syms = e.free_symbols
+        return bool(syms) and all(sym.name in cls.variables for sym in syms) and e.is_polynomial(*syms)
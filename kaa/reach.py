@@ -1,9 +1,9 @@
-import copy
+import numpy as np
 from termcolor import colored
 
 from kaa.timer import Timer
 from kaa.bundle import Bundle, BundleTransformer, BundleMode
-from kaa.flowpipe import FlowPipe
+from kaa.flowpipe import FlowPipe, DiskBundleStore
 from kaa.settings import KaaSettings
 
 
@@ -19,42 +19,73 @@ class ReachSet:
     def __init__(self, model):
         self.model = model
 
+        'Refinement report of the optimization procedure for each step of the last computation.'
+        self.step_reports = []
+
     """
     Compute reachable set for the alloted number of time steps.
     @params time_steps: number of time steps to carry out the reachable set computation.
             TempStrat: template loading strategy to use during this reachable set computation.
+            spill: spill the bundles to memory-mapped files instead of keeping them in RAM, defaults to KaaSettings.SpillFlowPipe
     @returns FlowPipe object containing computed flowpipe
     """
-    def computeReachSet(self, time_steps, tempstrat=None, transmode=BundleMode.AFO):
+    def computeReachSet(self, time_steps, tempstrat=None, transmode=BundleMode.AFO, spill=None):
 
-        initial_set = self.model.bund
-        transformer = BundleTransformer(self.model, transmode)
+        strat = tempstrat if tempstrat is not None else DefaultStrat(self.model)
+        spill = KaaSettings.SpillFlowPipe if spill is None else spill
+
+        'The bounding box of each step is kept in RAM, even when spilling, for LP-free projections.'
+        flowpipe = DiskBundleStore(self.model, KaaSettings.SpillDir) if spill else []
+        boxes = np.empty((time_steps + 1, self.model.dim, 2))
 
+        for step, bund in enumerate(self.iter_reach(time_steps, strat, transmode)):
+            flowpipe.append(bund)
+            boxes[step] = bund.getBoundingBox()
+
+        return FlowPipe(flowpipe, self.model, strat, boxes)
+
+    """
+    Generator computing the reachable set step by step. The initial set is yielded first, followed by the bundle
+    of each step as soon as it is computed.
+    @params time_steps: number of time steps to carry out the reachable set computation.
+            TempStrat: template loading strategy to use during this reachable set computation.
+    @returns generator of Bundle objects.
+    """
+    def iter_reach(self, time_steps, tempstrat=None, transmode=BundleMode.AFO):
+
+        curr_bund = self.model.bund
+        transformer = BundleTransformer(self.model, transmode)
         strat = tempstrat if tempstrat is not None else DefaultStrat(self.model)
-        flowpipe = [initial_set]
+        self.step_reports = []
+
+        try:
+            yield curr_bund
+
+            for ind in range(time_steps):
+
+                Timer.start('Reachable Set Computation')
 
-        for ind in range(time_steps):
-            
-            Timer.start('Reachable Set Computation')
+                starting_bund = curr_bund.copy()
 
-            starting_bund = copy.deepcopy(flowpipe[ind])
+                #print("Open: L: {} \n T: {}".format(starting_bund.L, starting_bund.T))
+                #print("Open: Offu: {} \n Offl{}".format(starting_bund.offu, starting_bund.offl))
 
-            #print("Open: L: {} \n T: {}".format(starting_bund.L, starting_bund.T))
-            #print("Open: Offu: {} \n Offl{}".format(starting_bund.offu, starting_bund.offl))
+                strat.open_strat(starting_bund)
+                trans_bund = transformer.transform(starting_bund)
+                strat.close_strat(trans_bund)
 
-            strat.open_strat(starting_bund)
-            trans_bund = transformer.transform(starting_bund)
-            strat.close_strat(trans_bund)
-            
-            #print("Close: L: {} \n T: {}".format(trans_bund.L, trans_bund.T))
-            #print("Close: Offu: {} Offl{}".format(trans_bund.offu, trans_bund.offl))
+                #print("Close: L: {} \n T: {}".format(trans_bund.L, trans_bund.T))
+                #print("Close: Offu: {} Offl{}".format(trans_bund.offu, trans_bund.offl))
 
-            reach_time = Timer.stop('Reachable Set Computation')
+                reach_time = Timer.stop('Reachable Set Computation')
+                self.step_reports.append(transformer.step_report)
 
-            'TODO: Revamp Kaa.log to be output sink handling all output formatting.'
-            if not KaaSettings.SuppressOutput:
-                print("Computed Step {} -- Time Elapsed: {} sec".format(bolden(ind), bolden(reach_time)))
-                
-            flowpipe.append(trans_bund)
+                'TODO: Revamp Kaa.log to be output sink handling all output formatting.'
+                if not KaaSettings.SuppressOutput:
+                    report = "" if transformer.step_report is None else " -- Refinement: {}".format(transformer.step_report)
+                    print("Computed Step {} -- Time Elapsed: {} sec{}".format(bolden(ind), bolden(reach_time), report))
 
-        return FlowPipe(flowpipe, self.model, strat)
+                curr_bund = trans_bund
+                yield curr_bund
+        finally:
+            transformer.close()
@@ -1,5 +1,6 @@
 from kaa.opts.kodiak import KodiakProd
-from kaa.opts.bernstein import BernsteinProd
+from kaa.opts.bernstein import BernsteinProd, BernsteinTensorProd
+from kaa.opts.interval import IntervalProd
 
 from kaa.templates import *
 
@@ -7,11 +8,20 @@ from kaa.templates import *
 Simple settings file for the in-and-outs of Kaa.
 """
 class KaaSettings:
-    'Should we try to parallelize the generator calculations?'
+    'Should we parallelize the bundle transformation across parallelotopes with a persistent process pool?'
     use_parallel = False
 
+    'Number of worker processes used when use_parallel is toggled. None uses every available core.'
+    NumWorkers = None
+
+    'Should Experiment and ExperimentBatch run their reachable set computations in a process pool?'
+    ParallelExperiments = False
+
+    'Base seed from which every experiment job derives its own RNG seed.'
+    ExperimentSeed = 0
+
     'The optimiation procedure to use in the bundle transformation. Optimization procedures are located in kaa.opts'
-    OptProd = BernsteinProd
+    OptProd = BernsteinTensorProd
 
     'The default template loading/unloading strategy to use during reachable set computations'
     DefaultStrat = StaticStrat
@@ -19,8 +29,35 @@ class KaaSettings:
     'Suppress Output?'
     SuppressOutput = False
 
-    'Number of samples to be used for volume estimation'
-    VolumeSamples = 500
+    'LP backend used by kaa.lputil: glpk, highs or auto to pick from the problem size.'
+    LPBackend = 'auto'
+
+    'Spill flowpipes to memory-mapped files instead of keeping every bundle in RAM?'
+    SpillFlowPipe = False
+
+    'Directory for flowpipe spill files. None uses the system temporary directory.'
+    SpillDir = None
+
+    'Cache numerically composed dynamics of Model(compose=k) on disk?'
+    CacheComposition = True
+
+    'Directory of the composition cache. None uses a kaa_compose folder in the system temporary directory.'
+    CompositionCacheDir = None
+
+    'Volume metric of bundles used by FlowPipe: sample (Monte-Carlo estimate), exact (vertex enumeration) or bound (smallest parallelotope)'
+    VolumeMethod = 'sample'
+
+    'Maximum number of samples to be used for volume estimation, rounded up to a whole number of batches'
+    VolumeSamples = 512
+
+    'Sequence used to sample points for volume estimation: sobol, halton or random'
+    VolumeSampler = 'sobol'
+
+    'Number of points sampled and tested at once during volume estimation. Powers of two suit the Sobol sequence.'
+    VolumeBatchSize = 128
+
+    'Stop volume estimation early once the estimated relative error falls below this value. None always uses VolumeSamples.'
+    VolumeTargetError = None
 
 
 class PlotSettings:
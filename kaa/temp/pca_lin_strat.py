@@ -1,11 +1,10 @@
 import numpy as np
 from itertools import product
 from random import uniform
-from sklearn.decomposition import PCA
 
 from kaa.templates import TempStrategy
+from kaa.temp.pca_strat import principal_dirs, sample_end_points
 from kaa.bundle import Bundle
-from kaa.experiutil import generate_traj
 from kaa.timer import Timer
 
 """
@@ -35,18 +34,8 @@ class PCALinStrat(TempStrategy):
             #
             #print("Before: offu: {}  offl: {}".format(bund.offu, bund.offl))
 
-            trajs = generate_traj(bund, self.num_trajs, self.traj_steps)
-            traj_mat = np.empty((self.num_trajs, bund.dim))
-
-            'Populate data matrix for PCA routine.'
-            for traj_idx, traj in enumerate(trajs):
-                traj_mat[traj_idx] = traj.end_point
-
-            pca = PCA(n_components=self.model.dim)
-            pca.fit(traj_mat)
-
-            comps = pca.components_
-            mean = pca.mean_
+            traj_mat = sample_end_points(bund, self.num_trajs, self.traj_steps)
+            comps = principal_dirs(traj_mat, self.model.dim)
 
             approx_A = self._approx_A(bund, self.dim+2)
             inv_A = np.linalg.inv(approx_A)
@@ -89,17 +78,15 @@ class PCALinStrat(TempStrategy):
 
     def _approx_A(self, bund, num_traj):
 
-        trajs = generate_traj(bund, num_traj, self.iter_steps)
+        start_points, end_points = sample_end_points(bund, num_traj, self.iter_steps, return_init=True)
         coeff_mat = np.zeros((self.dim*num_traj,self.dim**2), dtype='float')
 
         'Initialize the A matrix containing linear constraints.'
-        for t_idx, t in enumerate(trajs):
+        for t_idx, start_point in enumerate(start_points):
             for i in range(self.dim):
-                for j in range(self.dim):
-                    coeff_mat[i+self.dim*t_idx][i*self.dim+j] = t.start_point[j]
+                coeff_mat[i+self.dim*t_idx][i*self.dim:(i+1)*self.dim] = start_point
 
-        b_mat_vec = np.asarray([t.end_point for t in trajs], dtype='float')
-        b_mat = b_mat_vec.flatten()
+        b_mat = end_points.flatten()
 
         m = np.linalg.lstsq(coeff_mat, b_mat, rcond=None)[0]
         return m.reshape((self.dim,self.dim))
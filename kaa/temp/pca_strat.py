@@ -1,22 +1,78 @@
 import numpy as np
-from sklearn.decomposition import PCA
+from scipy.linalg import svd, qr
 
 from kaa.templates import TempStrategy, GeneratedDirs
 from kaa.bundle import Bundle
 from kaa.timer import Timer
+from kaa.trajectory import propagate, simulate
+
+'Sample matrices with at least this many entries use the randomized SVD when only some components are requested.'
+RANDOMIZED_MIN_SIZE = 10**6
+
+"""
+Computes the principal directions of a cloud of points. The points are centered in place and decomposed with a thin SVD.
+For truncated decompositions of large clouds, a randomized SVD (Halko, Martinsson and Tropp) projects the centered
+points onto a few random directions refined by power iterations and only decomposes that small projection.
+Each direction is signed so that its largest entry is positive.
+@params points: (N x dim) array of points, overwritten by the centered points
+        num_comps: number of components, defaults to dim
+        method: 'full', 'randomized' or None to choose from the size of the problem
+        oversample: extra random directions used by the randomized SVD
+        power_iters: power iterations used by the randomized SVD
+@returns (num_comps x dim) matrix whose rows are the principal directions by decreasing variance.
+"""
+def principal_dirs(points, num_comps=None, method=None, oversample=10, power_iters=2):
+    num_points, dim = points.shape
+    num_comps = dim if num_comps is None else num_comps
+    assert num_comps <= min(num_points, dim), f"Cannot extract {num_comps} principal directions from {num_points} points in {dim} dimensions."
+
+    if method is None:
+        method = 'randomized' if num_comps < min(num_points, dim) and points.size >= RANDOMIZED_MIN_SIZE else 'full'
+
+    points -= points.mean(axis=0)
+
+    if method == 'full':
+        _, _, comps = svd(points, full_matrices=False, overwrite_a=True, check_finite=False)
+    else:
+        assert method == 'randomized', f"Unknown SVD method: {method}"
+
+        rng = np.random.default_rng(np.random.randint(2**32 - 1))
+        basis, _ = qr(points @ rng.standard_normal((dim, min(num_comps + oversample, dim))), mode='economic', check_finite=False)
+        for _ in range(power_iters):
+            basis, _ = qr(points @ (points.T @ basis), mode='economic', check_finite=False)
+
+        _, _, comps = svd(basis.T @ points, full_matrices=False, check_finite=False)
+
+    comps = comps[:num_comps]
+    signs = np.sign(comps[np.arange(num_comps), np.argmax(np.abs(comps), axis=1)])
+    return comps * signs[:, None]
+
+"""
+Samples points around the Chebyshev center of the bundle and propagates them through the vectorized dynamics.
+@params bund: Bundle object
+        num_trajs: number of points
+        traj_steps: number of time steps
+        return_init: whether to also return the sampled initial points
+@returns (num_trajs x dim) matrix of end points, preceded by the matrix of initial points if return_init is set.
+"""
+def sample_end_points(bund, num_trajs, traj_steps, return_init=False):
+    init_points = bund.getIntersect().gen_ran_pts_box(num_trajs)
+    end_points = propagate(bund.model, init_points, traj_steps)
+    return (init_points, end_points) if return_init else end_points
 
 """
 Abstract PCA class containing all of the tools PCA strats need.
 """
 class AbstractPCAStrat(TempStrategy):
 
-    def __init__(self, model, traj_steps, num_trajs, pca_dirs):
-        assert isinstance(pca_dirs, GeneratedPCADirs), "PCA Strategies may only take pre-generated PCA directions."
+    def __init__(self, model, traj_steps, num_trajs, pca_dirs, svd_method=None):
+        assert pca_dirs is None or isinstance(pca_dirs, GeneratedPCADirs), "PCA Strategies may only take pre-generated PCA directions."
 
         super().__init__(model)
         self.traj_steps = traj_steps
         self.num_trajs = num_trajs
         self.pca_dirs = pca_dirs
+        self.svd_method = svd_method
 
     def open_strat(self, bund):
         pass
@@ -26,15 +82,11 @@ class AbstractPCAStrat(TempStrategy):
 
     def generate_pca_dir(self, bund):
         if self.pca_dirs is None:
-            trajs = bund.getIntersect().generate_traj(self.num_trajs, self.traj_steps)
-            traj_mat = trajs.end_points
-
-            pca = PCA(n_components=self.dim)
-            pca.fit(traj_mat)
-            pca_dirs_mat = pca.components_
+            traj_mat = sample_end_points(bund, self.num_trajs, self.traj_steps)
+            pca_dirs_mat = principal_dirs(traj_mat, self.dim, self.svd_method)
 
         else:
-            pca_dirs_mat = self.pca_dirs.get_dirs_at_step(self.counter+1)
+            pca_dirs_mat = self.pca_dirs.get_dirs_at_step(self.counter)
 
         ptope_dir_labels = [str((self.counter, comp_idx)) for comp_idx, _ in enumerate(pca_dirs_mat)]
         return pca_dirs_mat, ptope_dir_labels
@@ -44,8 +96,8 @@ Implementation of creating templates through PCA
 """
 class PCAStrat(AbstractPCAStrat):
 
-    def __init__(self, model, traj_steps=5, num_trajs=100, iter_steps=1, pca_dirs=None):
-        super().__init__(model, traj_steps, num_trajs, pca_dirs)
+    def __init__(self, model, traj_steps=5, num_trajs=100, iter_steps=1, pca_dirs=None, svd_method=None):
+        super().__init__(model, traj_steps, num_trajs, pca_dirs, svd_method)
         self.iter_steps = iter_steps
         self.pca_ptope_queue = []
 
@@ -75,8 +127,8 @@ Delayed PCA
 """
 class DelayedPCAStrat(AbstractPCAStrat):
 
-    def __init__(self, model, traj_steps=5, num_trajs=100, lifespan=3, pca_dirs=None):
-        super().__init__(model, traj_steps, num_trajs, pca_dirs)
+    def __init__(self, model, traj_steps=5, num_trajs=100, lifespan=3, pca_dirs=None, svd_method=None):
+        super().__init__(model, traj_steps, num_trajs, pca_dirs, svd_method)
         self.pca_ptope_life = []
         self.life_span = lifespan
 
@@ -115,15 +167,8 @@ class GeneratedPCADirs(GeneratedDirs):
         bund = model.bund
         dim = model.dim
 
-        generated_pca_dir_mat = np.empty((dim*num_steps, dim))
-        trajs = bund.getIntersect().generate_traj(num_trajs, num_steps) #trajs is TrajCollecton object'
-
-        for step in range(num_steps):
-            pca = PCA(n_components=dim)
-            pca.fit(trajs[num_steps]) #Takes point data from the (num_step)-th step of trajectories contained in TrajCollecton
-
-            pca_dirs = pca.components_
-            #print(pca_dirs_mat)
-            generated_pca_dir_mat = np.insert(generated_pca_dir_mat, step*dim, pca_dirs, axis=0)
+        init_points = bund.getIntersect().gen_ran_pts_box(num_trajs)
+        trajs = simulate(model, init_points, num_steps).swapaxes(0, 1) #trajs[step] holds the points of every trajectory at that step
 
-        return generated_pca_dir_mat
+        'principal_dirs centers its input in place, so each step is handed a copy.'
+        return np.vstack([principal_dirs(trajs[step + 1].copy(), dim) for step in range(num_steps)])
@@ -58,8 +58,8 @@ class TempStrategy(ABC):
     """
     def rm_ptope_from_bund(self, bund, ptope_label):
         ptope_dir_labels = self.ptope_hash[ptope_label]
-        bund.remove_dirs(self, ptope_dir_labels)
         bund.remove_temp(self, ptope_label)
+        bund.remove_dirs(self, ptope_dir_labels)
         self.__pop_ptope(ptope_label)
 
     """
@@ -141,5 +141,10 @@ class GeneratedDirs:
         self.dim = model.dim
         self.dir_mat = dir_mat
 
+    """
+    Returns the block of dim directions generated for the input step.
+    @params step_num: index of the step, starting from 0
+    @returns (dim x dim) matrix of directions.
+    """
     def get_dirs_at_step(self, step_num):
-        return self.dir_mat[step_num:step_num+self.dim,]
+        return self.dir_mat[step_num*self.dim:(step_num+1)*self.dim]
@@ -54,6 +54,15 @@ class Timer:
         else:
             raise RuntimeError("Previous timer has not been stopped yet or timer has not been instantiated for Timer: {}.".format(label))
 
+    """
+    Merges a timer table gathered elsewhere, such as in a worker process, into the global table.
+    @params time_table: dictionary from labels to lists of TimerData
+    """
+    @staticmethod
+    def merge(time_table):
+        for label, times in time_table.items():
+            Timer.time_table.setdefault(label, []).extend(times)
+
     @staticmethod
     def generate_stats():
 
@@ -1,51 +1,86 @@
 import numpy as np
 
 """
-Wrapper around list for representing arbitrary trajectories of a system.
+Propagates a batch of points through the dynamics of a model. Every step advances all points at once
+through the model's vectorized dynamics.
+@params model: Model
+        init_points: (N x dim) array of initial points
+        steps: number of time steps to propagate
+@returns (N x steps+1 x dim) array whose [i, t] entry is the t-th point of the i-th trajectory.
+"""
+def simulate(model, init_points, steps):
+    init_points = np.atleast_2d(np.asarray(init_points, dtype=float))
+    assert init_points.shape[1] == model.dim, "Trajectory dimensions should match system dimensions."
+
+    traj_arr = np.empty((len(init_points), steps + 1, model.dim))
+    traj_arr[:, 0] = init_points
+
+    for step in range(steps):
+        traj_arr[:, step + 1] = model.f_vec(traj_arr[:, step])
+
+    return traj_arr
+
+"""
+Propagates a batch of points through the dynamics of a model, keeping only the end points.
+@params model: Model
+        init_points: (N x dim) array of initial points
+        steps: number of time steps to propagate
+@returns (N x dim) array of end points.
+"""
+def propagate(model, init_points, steps):
+    points = np.atleast_2d(np.asarray(init_points, dtype=float))
+    assert points.shape[1] == model.dim, "Points dimensions should match system dimensions."
+
+    for _ in range(steps):
+        points = model.f_vec(points)
+
+    return points
+
+"""
+Wrapper around an array of points representing an arbitrary trajectory of a system.
 """
 class Traj:
 
     def __init__(self, model, initial_point, steps=0):
         self.model = model
         self.vars = model.vars
-        self.traj_set = {}
-        self.num_points = 0
-
-        for var in self.vars:
-            self.traj_set[var] = []
 
         'Initialize point and propagate for steps.'
-        self.add_point(initial_point)
-        self.propagate(steps)
-        
+        self.points = simulate(model, [initial_point], steps)[0]
+
+    """
+    Wraps an existing (steps x dim) array of points as a Traj without simulating.
+    @params model: Model
+            points: array of trajectory points
+    @returns Traj object
+    """
+    @staticmethod
+    def from_points(model, points):
+        traj = object.__new__(Traj)
+        traj.model = model
+        traj.vars = model.vars
+        traj.points = points
+
+        return traj
+
+    @property
+    def num_points(self):
+        return len(self.points)
+
     """
     Add a point from the system to the trajectory.
     @params traj_point: point to add to the trajectory.
     """
     def add_point(self, traj_point):
         assert len(traj_point) == len(self.vars), "Trajectory dimensions should match system dimensions."
-        
-        for var_ind, var in enumerate(self.vars):
-            self.traj_set[var].append(traj_point[var_ind])
-        self.num_points += 1
+        self.points = np.vstack((self.points, traj_point))
 
     """
     Propagate tip of trajectory for alloted number of time_steps
     @params time_steps: number of time steps to generate trajectory
     """
     def propagate(self, time_steps):
-        df = self.model.f
-
-        'Propagate the points according to the dynamics for designated number of time steps.'
-        prev_point = self.end_point
-
-        for _ in range(time_steps):
-            
-            var_sub = [ (var, prev_point[var_idx]) for var_idx, var in enumerate(self.vars)]
-            next_point = [ f.subs(var_sub) for f in df ]
-            self.add_point(next_point)
-
-            prev_point = next_point
+        self.points = np.vstack((self.points, simulate(self.model, [self.end_point], time_steps)[0, 1:]))
 
     """
     Returns the projection of the trajectory onto an variable axis
@@ -53,18 +88,14 @@ class Traj:
     @returns projection onto axis determined by var.
     """
     def get_proj(self, var):
-        return self.traj_set[var]
+        return self.points[:, self.vars.index(var)]
 
     """
     Returns numpy matrix with rows containing trajectory points.
     @returns matrix containing trajectory points.
     """
     def get_mat(self):
-        dim = len(self.vars)
-        mat = np.empty((self.num_points, dim))
-
-        for i in range(self.num_points):
-            mat[i] = [ self.traj_set[var][i] for var in self.vars  ]
+        return self.points
 
     @property
     def end_point(self):
@@ -80,36 +111,64 @@ class Traj:
     @property
     def model_name(self):
         return self.model.name
-    
+
 
     def __getitem__(self, index):
-        return [ (self.traj_set[var])[index] for var in self.vars ]
+        return self.points[index]
 
     def __len__(self):
         return self.num_points
 
+"""
+Collection of trajectories of equal length backed by one (N x steps x dim) array.
+"""
 class TrajCollection:
 
     def __init__(self, traj_list):
         assert isinstance(traj_list, list), "input must be list of Traj objects"
-        self.traj_list = traj_list
+
+        self.model = traj_list[0].model
+        self.traj_arr = np.stack([ traj.points for traj in traj_list ])
+
+    """
+    Simulates trajectories from a batch of initial points.
+    @params model: Model
+            init_points: (N x dim) array of initial points
+            steps: number of time steps to propagate
+    @returns TrajCollection object
+    """
+    @staticmethod
+    def simulate(model, init_points, steps):
+        return TrajCollection.from_array(model, simulate(model, init_points, steps))
+
+    """
+    Wraps an existing (N x steps x dim) trajectory array.
+    """
+    @staticmethod
+    def from_array(model, traj_arr):
+        traj_col = object.__new__(TrajCollection)
+        traj_col.model = model
+        traj_col.traj_arr = traj_arr
+
+        return traj_col
 
     @property
-    def model(self):
-        return self.traj_list[0].model
+    def traj_list(self):
+        return [ Traj.from_points(self.model, points) for points in self.traj_arr ]
 
     @property
     def end_points(self):
-        end_points_list = [traj.end_point for traj in self.traj_list]
-        return np.asarray(end_points_list)
+        return self.traj_arr[:, -1]
 
     @property
     def max_traj_len(self):
-        return max([len(traj) for traj in self.traj_list])
+        return self.traj_arr.shape[1]
 
     def __getitem__(self, index):
-        traj_points_list = [traj[index] for traj in self.traj_list]
-        return np.asarray(traj_points_list)
+        return self.traj_arr[:, index]
 
     def __iter__(self):
         return iter(self.traj_list)
+
+    def __len__(self):
+        return len(self.traj_arr)
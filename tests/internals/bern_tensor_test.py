@@ -0,0 +1,127 @@
+import numpy as np
+import sympy as sp
+
+from kaa.opts.bernstein import BernsteinProd, BernsteinTensorProd, SparseBernsteinProd, bern_transform, de_casteljau
+from kaa.polynomial import Polynomial
+
+from dummies import DummyBund
+
+def test_tensor_univar():
+
+    x = sp.Symbol('x')
+    bund = DummyBund([x])
+
+    assert BernsteinTensorProd(3*x + 2*x**2 + x**3, bund).getBounds() == (6, 0)
+    assert BernsteinTensorProd(x**2, bund).getBounds() == (1, 0)
+
+def test_tensor_matches_bernstein():
+
+    x, y, z = sp.Symbol('x'), sp.Symbol('y'), sp.Symbol('z')
+    bund = DummyBund([x,y,z])
+    rand = np.random.RandomState(0)
+
+    for _ in range(5):
+        exps = rand.randint(0, 3, size=(6,3))
+        coeffs = rand.uniform(-1, 1, size=6)
+        poly = Polynomial(exps, coeffs)._reduce()
+
+        assert np.allclose(BernsteinTensorProd(poly, bund).getBounds(), BernsteinProd(poly, bund).getBounds())
+
+def test_tensor_dir_bounds():
+
+    x, y = sp.Symbol('x'), sp.Symbol('y')
+    bund = DummyBund([x,y])
+
+    fog = [ Polynomial.from_sympy(x*y + 0.5*x**2, [x,y]), Polynomial.from_sympy(y - x*y**2, [x,y]) ]
+    dir_mat = np.array([[1, 0], [0, 1], [1, -0.5]])
+
+    ub, lb = BernsteinTensorProd.getDirBounds(fog, dir_mat, bund)
+
+    for dir_idx, dir_vec in enumerate(dir_mat):
+        dir_ub, dir_lb = BernsteinProd(Polynomial.lin_comb(dir_vec, fog), bund).getBounds()
+        assert np.isclose(ub[dir_idx], dir_ub) and np.isclose(lb[dir_idx], dir_lb)
+
+def test_de_casteljau_halves():
+
+    x, y = sp.Symbol('x'), sp.Symbol('y')
+    poly = Polynomial.from_sympy(x*y - 0.5*x**2 + y**3, [x,y])
+    bern_tensor = bern_transform(poly.to_dense(poly.degree))
+
+    'The halves along x are the Bernstein coefficients of p(x/2, y) and p((x+1)/2, y).'
+    left, right = de_casteljau(bern_tensor, 0)
+    left_poly = Polynomial.from_sympy((x/2)*y - 0.5*(x/2)**2 + y**3, [x,y])
+    right_poly = Polynomial.from_sympy(((x+1)/2)*y - 0.5*((x+1)/2)**2 + y**3, [x,y])
+
+    assert np.allclose(left, bern_transform(left_poly.to_dense(poly.degree)))
+    assert np.allclose(right, bern_transform(right_poly.to_dense(poly.degree)))
+
+def test_tensor_subdivision():
+
+    x, y = sp.Symbol('x'), sp.Symbol('y')
+    bund = DummyBund([x,y])
+    poly = Polynomial.from_sympy(4*x*(1 - x) + x*y - y**2, [x,y])
+
+    raw_ub, raw_lb = BernsteinTensorProd(poly, bund).getBounds()
+
+    BernsteinTensorProd.subdivide = True
+    try:
+        with BernsteinTensorProd.step_scope():
+            ub, lb = BernsteinTensorProd(poly, bund).getBounds()
+            report = BernsteinTensorProd.step_report()
+    finally:
+        BernsteinTensorProd.subdivide = False
+
+    samples = np.linspace(0, 1, 201)
+    grid_x, grid_y = np.meshgrid(samples, samples)
+    vals = 4*grid_x*(1 - grid_x) + grid_x*grid_y - grid_y**2
+
+    assert raw_lb <= lb <= vals.min() and vals.max() <= ub <= raw_ub
+    assert ub < raw_ub
+
+    'The maximum 16/15 is interior, so its bound spends the whole budget. The minimum -1 sits at a vertex.'
+    assert np.isclose(ub, 16/15, atol=1e-3) and lb == -1
+    assert report == {'subdivisions': BernsteinTensorProd.max_subdivisions, 'unresolved': 1}
+    assert BernsteinTensorProd.step_report() is None
+
+def test_sparse_matches_tensor():
+
+    vars = sp.symbols('x0:5')
+    bund = DummyBund(list(vars))
+    rand = np.random.RandomState(1)
+
+    for _ in range(5):
+        exps = rand.randint(0, 3, size=(8,5)) * (rand.uniform(size=(8,5)) < 0.4)
+        coeffs = rand.uniform(-1, 1, size=8)
+        poly = Polynomial(exps, coeffs)._reduce()
+
+        sparse_prod = SparseBernsteinProd(poly, bund)
+        assert np.allclose(sparse_prod.getBounds(), BernsteinTensorProd(poly, bund).getBounds()) and sparse_prod.exact
+
+        'Splitting every bucket only loosens the bounds.'
+        SparseBernsteinProd.max_table_size = 1
+        try:
+            ub, lb = SparseBernsteinProd(poly, bund).getBounds()
+        finally:
+            SparseBernsteinProd.max_table_size = 2**16
+
+        tensor_ub, tensor_lb = BernsteinTensorProd(poly, bund).getBounds()
+        assert ub >= tensor_ub - 1e-12 and lb <= tensor_lb + 1e-12
+
+def test_sparse_fallback():
+
+    vars = sp.symbols('x0:20')
+    bund = DummyBund(list(vars))
+
+    'The dense tensor of this polynomial would hold 3^20 coefficients.'
+    expr = sum(v**2 - v for v in vars) + vars[0]*vars[19] - 2*vars[3]*vars[4]**2
+    poly = Polynomial.from_sympy(expr, list(vars))
+
+    ub, lb = BernsteinTensorProd(poly, bund).getBounds()
+    assert (ub, lb) == SparseBernsteinProd(poly, bund).getBounds()
+
+    vals = poly.eval(np.random.RandomState(0).uniform(size=(1000, 20)))
+    assert lb <= vals.min() and vals.max() <= ub
+
+    fog = [ Polynomial.from_sympy(v**2 + v*vars[(idx + 1) % 20], list(vars)) for idx, v in enumerate(vars) ]
+    dir_ub, dir_lb = BernsteinTensorProd.getDirBounds(fog, np.eye(20)[:3], bund)
+    assert np.allclose(dir_ub, 2) and np.allclose(dir_lb, 0)
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from kaa.templates import TempStrategy
+from models.vanderpol import VanDerPol
+
+class DummyStrat(TempStrategy):
+
+    def open_strat(self, bund):
+        pass
+
+    def close_strat(self, bund):
+        pass
+
+    def __str__(self):
+        return "DummyStrat"
+
+def test_add_remove_ptope():
+
+    model = VanDerPol()
+    bund = model.bund
+    strat = DummyStrat(model)
+    init_L, init_T = np.copy(bund.L), np.copy(bund.T)
+
+    first = strat.add_ptope_to_bund(bund, np.array([[1, 1], [1, -1]]), ["a0", "a1"])
+    second = strat.add_ptope_to_bund(bund, np.array([[2, 1], [1, 2]]), ["b0", "b1"])
+    assert bund.num_dir == len(init_L) + 4 and bund.num_temp == len(init_T) + 2
+
+    strat.rm_ptope_from_bund(bund, first)
+    assert bund.num_dir == len(init_L) + 2 and bund.num_temp == len(init_T) + 1
+
+    'The remaining template must still point at its own directions after the shift.'
+    assert np.array_equal(bund.L[bund.T[-1]], [[2, 1], [1, 2]])
+    assert np.array_equal(bund.T[:len(init_T)], init_T)
+    assert len(bund.get_ptopes_by_strat(strat)) == 1
+
+    strat.rm_ptope_from_bund(bund, second)
+    assert np.array_equal(bund.L, init_L) and np.array_equal(bund.T, init_T)
+
+def test_snapshot_copy_on_write():
+
+    model = VanDerPol()
+    bund = model.bund
+    strat = DummyStrat(model)
+
+    snapshot = bund.copy()
+    strat.add_ptope_to_bund(snapshot, np.array([[1, 1], [1, -1]]), ["a0", "a1"])
+    snapshot.offu = snapshot.offu + np.eye(snapshot.num_dir)[0]
+
+    assert snapshot.num_dir == bund.num_dir + 2
+    assert len(bund.L) == bund.num_dir and len(bund.dir_labels) == bund.num_dir
+    assert snapshot.offu[0] == bund.offu[0] + 1
+
+    'Offsets may only be replaced as a whole so that every change bumps the version.'
+    with pytest.raises(ValueError):
+        snapshot.offu[0] += 1
+
+def test_version_cache():
+
+    model = VanDerPol()
+    bund = model.bund.copy()
+    strat = DummyStrat(model)
+
+    ptope, box, version = bund.getParallelotope(0), bund.getBoundingBox(), bund.version
+    assert bund.getParallelotope(0) is ptope and bund.getIntersect() is bund.getIntersect()
+    assert ptope.chebyshev_center is ptope.chebyshev_center
+
+    'Adding a parallelotope changes the directions and starts a new version.'
+    strat.add_ptope_to_bund(bund, np.array([[1, 1], [1, -1]]), ["a0", "a1"])
+    assert bund.version > version and bund.getParallelotope(0) is not ptope
+
+    'Snapshots share the cache until either side changes.'
+    snapshot = bund.copy()
+    assert snapshot.getBoundingBox() is bund.getBoundingBox()
+
+    snapshot.offl = snapshot.offl + 1
+    assert snapshot.getBoundingBox() is not bund.getBoundingBox()
+    assert np.allclose(model.bund.getBoundingBox(), box)
+
+def test_batched_generators():
+
+    model = VanDerPol()
+    bund = model.bund
+    base_vertices, gen_mats = bund.getGenerators()
+
+    assert base_vertices.shape == (bund.num_temp, bund.dim) and gen_mats.shape == (bund.num_temp, bund.dim, bund.dim)
+    for temp_ind in range(bund.num_temp):
+        ptope = bund.getParallelotope(temp_ind)
+        A, b = ptope.A, ptope.b
+
+        'The base vertex lies on the upper facets and each generator moves it onto the matching lower facet.'
+        assert np.allclose(A[:bund.dim] @ base_vertices[temp_ind], b[:bund.dim])
+        for gen_ind in range(bund.dim):
+            vertex = base_vertices[temp_ind] + gen_mats[temp_ind][:, gen_ind]
+            expected = b[:bund.dim].copy()
+            expected[gen_ind] = -b[bund.dim + gen_ind]
+            assert np.allclose(A[:bund.dim] @ vertex, expected)
+
+        assert np.allclose(ptope.getGenerators()[1], gen_mats[temp_ind])
@@ -0,0 +1,37 @@
+import os
+import numpy as np
+import sympy as sp
+
+from kaa.model import Model
+from kaa.polynomial import PolyMap
+from kaa.settings import KaaSettings
+
+def make_model(compose=0):
+    x, y = sp.Symbol('x'), sp.Symbol('y')
+    dyns = [x + 0.1*(y - x*y), y + 0.1*(x**2 - 0.5*y)]
+
+    return Model(dyns, [x, y], np.array([[0, 1]]), np.eye(2), np.ones(2), np.ones(2), name="Dummy", compose=compose)
+
+def test_compose_matches_sympy(tmp_path):
+
+    KaaSettings.CompositionCacheDir = str(tmp_path)
+    try:
+        model = make_model(compose=2)
+        cached_model = make_model(compose=2)
+    finally:
+        KaaSettings.CompositionCacheDir = None
+
+    'Two compositions give the four-step map.'
+    base = make_model()
+    x, y = base.vars
+    f = base.f
+    for _ in range(2):
+        f = [ func.subs([(x, f[0]), (y, f[1])], simultaneous=True) for func in f ]
+
+    points = np.random.RandomState(0).uniform(-1, 1, size=(10, 2))
+    expected = PolyMap.from_sympy(f, base.vars).eval(points)
+
+    assert np.allclose(model.f_vec(points), expected)
+    assert np.allclose(cached_model.f_vec(points), expected)
+    assert np.allclose(PolyMap.from_sympy(model.f, model.vars).eval(points), expected)
+    assert len(os.listdir(tmp_path)) == 1
@@ -0,0 +1,9 @@
+"""
+Minimal stand-in for a Bundle or Model exposing only the variables and the dimension,
+which is all the optimization procedures and LinearSystem read from it.
+"""
+class DummyBund:
+
+    def __init__(self, vars):
+        self.vars = vars
+        self.dim = len(vars)
@@ -0,0 +1,28 @@
+import numpy as np
+
+from kaa.reach import ReachSet
+from kaa.settings import KaaSettings
+from models.sir import SIR
+
+def test_spilled_flowpipe_matches():
+
+    model = SIR()
+
+    suppress_output = KaaSettings.SuppressOutput
+    KaaSettings.SuppressOutput = True
+    disk_pipe = None
+    try:
+        mem_pipe = ReachSet(model).computeReachSet(4)
+        disk_pipe = ReachSet(model).computeReachSet(4, spill=True)
+
+        assert len(mem_pipe) == len(disk_pipe) == 5
+        for mem_bund, disk_bund in zip(mem_pipe, disk_pipe):
+            assert np.allclose(mem_bund.offu, disk_bund.offu) and np.allclose(mem_bund.offl, disk_bund.offl)
+            assert np.array_equal(mem_bund.T, disk_bund.T) and np.allclose(mem_bund.L, disk_bund.L)
+
+        assert np.allclose(mem_pipe.get2DProj(0), disk_pipe.get2DProj(0))
+        assert np.allclose(disk_pipe[-1].offu, mem_pipe[-1].offu)
+    finally:
+        KaaSettings.SuppressOutput = suppress_output
+        if disk_pipe is not None:
+            disk_pipe.flowpipe.close()
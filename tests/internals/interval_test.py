@@ -0,0 +1,36 @@
+import numpy as np
+import sympy as sp
+
+from kaa.opts.interval import IntervalProd
+from kaa.opts.bernstein import BernsteinTensorProd
+from kaa.polynomial import Polynomial
+
+from dummies import DummyBund
+
+def test_interval_univar():
+
+    x = sp.Symbol('x')
+    bund = DummyBund([x])
+
+    ub, lb = IntervalProd(3*x + 2*x**2 + x**3, bund).getBounds()
+    assert np.isclose(ub, 6, atol=1e-5) and np.isclose(lb, 0, atol=1e-5)
+
+    ub, lb = IntervalProd(sp.sin(4*x) + sp.sqrt(x + 1), bund).getBounds()
+    samples = np.linspace(0, 1, 10001)
+    vals = np.sin(4*samples) + np.sqrt(samples + 1)
+
+    assert vals.max() <= ub <= vals.max() + 1e-4
+    assert vals.min() - 1e-4 <= lb <= vals.min()
+
+def test_interval_contains_bernstein():
+
+    x, y = sp.Symbol('x'), sp.Symbol('y')
+    bund = DummyBund([x, y])
+    poly = Polynomial.from_sympy(x*y - 0.5*x**2 + y**3 - 0.3, [x, y])
+
+    int_ub, int_lb = IntervalProd(poly, bund).getBounds()
+    bern_ub, bern_lb = BernsteinTensorProd(poly, bund).getBounds()
+
+    'Branch-and-bound converges to the true range [-0.8, 1.2] which the Bernstein bounds enclose.'
+    assert np.isclose(int_ub, 1.2, atol=1e-5) and np.isclose(int_lb, -0.8, atol=1e-5)
+    assert int_ub <= bern_ub + 1e-5 and bern_lb - 1e-5 <= int_lb
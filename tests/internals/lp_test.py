@@ -0,0 +1,24 @@
+import numpy as np
+
+from kaa.lputil import lp_session, select_backend, LP_BACKENDS
+
+def test_backends_agree():
+
+    rand = np.random.RandomState(0)
+    A = np.vstack((np.eye(3), -np.eye(3), rand.randn(10, 3)))
+    b = rand.uniform(0.5, 1.5, len(A))
+
+    objs = rand.randn(5, 3)
+    sols = {}
+    for backend in LP_BACKENDS:
+        with lp_session(A, b, backend) as lp:
+            sols[backend] = [ (lp.max(c).fun, lp.min(c).fun) for c in objs ]
+
+    for backend in LP_BACKENDS:
+        assert np.allclose(sols[backend], sols['glpk'])
+
+def test_auto_select():
+
+    assert select_backend(12, 3) == 'glpk'
+    assert select_backend(20, 7) == 'glpk'
+    assert select_backend(1600, 3) == 'glpk'
@@ -0,0 +1,26 @@
+import numpy as np
+
+from kaa.bundle import BundleTransformer, BundleMode
+from kaa.reach import ReachSet
+from kaa.settings import KaaSettings
+from models.sir import SIR
+
+def test_parallel_matches_serial():
+
+    serial = ReachSet(SIR()).computeReachSet(3)
+
+    use_parallel, num_workers = KaaSettings.use_parallel, KaaSettings.NumWorkers
+    KaaSettings.use_parallel, KaaSettings.NumWorkers = True, 2
+    try:
+        transformer = BundleTransformer(SIR(), BundleMode.AFO)
+        assert transformer.pool is not None
+        transformer.close()
+
+        parallel = ReachSet(SIR()).computeReachSet(3)
+    finally:
+        KaaSettings.use_parallel, KaaSettings.NumWorkers = use_parallel, num_workers
+
+    assert len(serial) == len(parallel) == 4
+    for serial_bund, parallel_bund in zip(serial, parallel):
+        assert np.allclose(serial_bund.offu, parallel_bund.offu)
+        assert np.allclose(serial_bund.offl, parallel_bund.offl)
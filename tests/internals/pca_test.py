@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from kaa.reach import ReachSet
+from kaa.temp.pca_strat import PCAStrat, GeneratedPCADirs, principal_dirs
+from kaa.trajectory import simulate
+from models.vanderpol import VanDerPol
+
+def test_principal_dirs():
+
+    rand = np.random.RandomState(0)
+    rot, _ = np.linalg.qr(rand.normal(size=(4, 4)))
+    points = (rand.normal(size=(2000, 4)) * [10, 5, 1, 0.1]) @ rot.T + 3
+
+    'Principal directions are the eigenvectors of the covariance by decreasing eigenvalue, up to sign.'
+    eigvals, eigvecs = np.linalg.eigh(np.cov(points.T))
+    expected = eigvecs[:, ::-1].T
+
+    for method, num_comps in (('full', 4), ('randomized', 2)):
+        comps = principal_dirs(points.copy(), num_comps, method)
+
+        assert comps.shape == (num_comps, 4)
+        assert np.allclose(np.abs(np.sum(comps * expected[:num_comps], axis=1)), 1, atol=1e-4)
+        assert np.all(comps[np.arange(num_comps), np.argmax(np.abs(comps), axis=1)] > 0)
+
+    'A thin SVD of fewer points than requested components cannot supply every direction.'
+    with pytest.raises(AssertionError):
+        principal_dirs(points[:3].copy(), 4)
+
+def test_pca_strat():
+
+    np.random.seed(0)
+    model = VanDerPol()
+    init_num_temp = model.bund.num_temp
+
+    reach = ReachSet(model)
+    bunds = list(reach.iter_reach(3, PCAStrat(model, iter_steps=1)))
+
+    'Each step replaces the previous PCA template with a fresh one.'
+    assert [ bund.num_temp for bund in bunds[1:] ] == [init_num_temp + 1] * 3
+    assert all(np.all(bund.offu >= -bund.offl) for bund in bunds)
+
+def test_generated_pca_dirs():
+
+    model = VanDerPol()
+    num_trajs, num_steps = 200, 3
+
+    np.random.seed(0)
+    dir_mat = GeneratedPCADirs(model, num_trajs, num_steps).dir_mat
+
+    np.random.seed(0)
+    trajs = simulate(model, model.bund.getIntersect().gen_ran_pts_box(num_trajs), num_steps)
+
+    'Block k holds the principal directions of the points reached after k+1 steps.'
+    assert dir_mat.shape == (num_steps * model.dim, model.dim)
+    for step in range(num_steps):
+        block = dir_mat[step * model.dim:(step + 1) * model.dim]
+        assert np.allclose(block, principal_dirs(trajs[:, step + 1].copy(), model.dim))
+
+def test_pca_strat_generated_dirs():
+
+    np.random.seed(0)
+    model = VanDerPol()
+    num_steps = 3
+
+    pca_dirs = GeneratedPCADirs(model, 200, num_steps)
+    bunds = list(ReachSet(model).iter_reach(num_steps, PCAStrat(model, iter_steps=1, pca_dirs=pca_dirs)))
+
+    'The template added at step k is spanned by the k-th block of generated directions.'
+    for step, bund in enumerate(bunds[1:]):
+        assert np.allclose(bund.L[bund.T[-1]], pca_dirs.get_dirs_at_step(step))
+        assert np.allclose(pca_dirs.get_dirs_at_step(step), pca_dirs.dir_mat[step * model.dim:(step + 1) * model.dim])
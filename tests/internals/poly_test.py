@@ -0,0 +1,32 @@
+import numpy as np
+import sympy as sp
+
+from kaa.polynomial import Polynomial, PolyMap
+
+def test_poly_from_sympy():
+
+    x, y = sp.Symbol('x'), sp.Symbol('y')
+    p = Polynomial.from_sympy(3*x**2*y - y + 2, [x,y])
+
+    assert p.coeff((2,1)) == 3
+    assert p.coeff((0,1)) == -1
+    assert p.coeff((0,0)) == 2
+    assert p.coeff((1,1)) == 0
+    assert list(p.degree) == [2,1]
+
+def test_poly_compose_affine():
+
+    x, y = sp.Symbol('x'), sp.Symbol('y')
+    dyns = [x + 0.1*x*y, y - 0.2*x**2]
+    f_poly = PolyMap.from_sympy(dyns, [x,y])
+
+    q = np.array([0.5, -1])
+    G = np.array([[1, 0.5], [-0.25, 2]])
+    fog = f_poly.compose_affine(q, G)
+
+    gen_sub = [ (var, q[i] + G[i][0]*x + G[i][1]*y) for i, var in enumerate([x,y]) ]
+    points = np.random.rand(10, 2)
+
+    for func, comp in zip(dyns, fog):
+        expected = [ float(func.subs(gen_sub, simultaneous=True).subs([(x, a), (y, b)])) for a, b in points ]
+        assert np.allclose(comp.eval(points), expected)
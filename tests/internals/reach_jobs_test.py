@@ -0,0 +1,22 @@
+import numpy as np
+
+from kaa.parallel import run_reach_jobs
+from kaa.settings import KaaSettings
+from models.sir import SIR
+from models.vanderpol import VanDerPol
+
+def test_parallel_jobs_match_serial():
+
+    jobs = [ (SIR(), None, 3), (VanDerPol(), None, 3) ]
+
+    suppress_output = KaaSettings.SuppressOutput
+    KaaSettings.SuppressOutput = True
+    try:
+        serial = run_reach_jobs(jobs, parallel=False, vol_method='sample')
+        parallel = run_reach_jobs(jobs, parallel=True, num_workers=2, vol_method='sample')
+    finally:
+        KaaSettings.SuppressOutput = suppress_output
+
+    for serial_pipe, parallel_pipe in zip(serial, parallel):
+        assert np.array_equal(serial_pipe.boxes, parallel_pipe.boxes)
+        assert np.array_equal(serial_pipe.get_volume_data('sample'), parallel_pipe.get_volume_data('sample'))
@@ -0,0 +1,21 @@
+import numpy as np
+import sympy as sp
+
+from kaa.linearsystem import LinearSystem
+from kaa.parallelotope import Parallelotope
+
+from dummies import DummyBund
+
+def test_support_vertices_match_lp():
+
+    model = DummyBund([sp.Symbol('x'), sp.Symbol('y')])
+
+    A = np.array([[1, 1], [-1, 2], [-1, -1], [1, -2]])
+    b = np.array([1, 2, 0.5, 1])
+    D = np.random.RandomState(0).randn(8, 2)
+
+    ptope_vals, ptope_pts = Parallelotope(model, A, b).support(D)
+    lp_vals, _ = LinearSystem(model, A, b).support(D)
+
+    assert np.allclose(ptope_vals, lp_vals)
+    assert np.allclose(np.sum(D * ptope_pts, axis=1), ptope_vals)
@@ -0,0 +1,28 @@
+import numpy as np
+import sympy as sp
+
+from kaa.model import Model
+from kaa.trajectory import Traj, TrajCollection
+from models.sir import SIR
+
+def test_simulate_matches_sympy():
+
+    model = SIR()
+    init_points = np.random.RandomState(0).uniform(0, 0.1, size=(4, model.dim))
+    trajs = TrajCollection.simulate(model, init_points, 3)
+
+    assert trajs.traj_arr.shape == (4, 4, model.dim)
+    for traj, init_point in zip(trajs, init_points):
+        point = init_point
+        for step in range(1, 4):
+            point = [ float(f.subs(list(zip(model.vars, point)))) for f in model.f ]
+            assert np.allclose(traj[step], point)
+
+def test_simulate_non_polynomial():
+
+    x, y = sp.Symbol('x'), sp.Symbol('y')
+    model = Model([x + 0.1*sp.sin(y), y + 0.1], [x, y], np.array([[0, 1]]), np.eye(2), np.ones(2), np.ones(2))
+
+    traj = Traj(model, [0.5, 1], steps=2)
+    assert np.allclose(traj[1], [0.5 + 0.1*np.sin(1), 1.1])
+    assert np.allclose(traj.get_proj(y), [1, 1.1, 1.2])
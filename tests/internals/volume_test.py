@@ -0,0 +1,38 @@
+import numpy as np
+import sympy as sp
+
+from kaa.linearsystem import LinearSystem
+from kaa.parallelotope import Parallelotope
+from kaa.settings import KaaSettings
+
+from dummies import DummyBund
+
+def test_volume_estimate_triangle():
+
+    model = DummyBund([sp.Symbol('x'), sp.Symbol('y')])
+
+    'Triangle x,y >= 0, x + y <= 1 inside its unit envelope box.'
+    A = np.array([[-1, 0], [0, -1], [1, 1]])
+    b = np.array([0, 0, 1])
+
+    try:
+        for sampler in ['sobol', 'halton', 'random']:
+            KaaSettings.VolumeSampler = sampler
+            lin_sys = LinearSystem(model, A, b)
+
+            assert abs(lin_sys.volume - 0.5) < 0.05
+            assert lin_sys.volume is lin_sys.volume
+    finally:
+        KaaSettings.VolumeSampler = 'sobol'
+
+def test_exact_volumes():
+
+    model = DummyBund([sp.Symbol('x'), sp.Symbol('y')])
+
+    'Parallelogram spanned by (1, 1) and (1, -1) around the origin has area 2.'
+    A = np.array([[1, 0], [0, 1], [-1, 0], [0, -1]]) @ np.array([[0.5, 0.5], [0.5, -0.5]])
+    b = np.array([1, 1, 0, 0])
+
+    ptope = Parallelotope(model, A, b)
+    assert np.isclose(ptope.volume, 2)
+    assert np.isclose(LinearSystem(model, A, b).exact_volume, 2)